@@ -4,6 +4,7 @@ from typing import List
 import requests
 from django.conf import settings
 from .embedding_utils import search_similar_chunks
+from .rag_utils import parse_google_text
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +13,19 @@ GOOGLE_GENERATE_MODEL = getattr(settings, 'GOOGLE_GENERATE_MODEL', 'gemini-2.5-f
 GOOGLE_API_BASE = "https://generativelanguage.googleapis.com/v1beta/models/"
 GOOGLE_CONNECT_TIMEOUT = getattr(settings, 'GOOGLE_CONNECT_TIMEOUT', 10)
 GOOGLE_READ_TIMEOUT = getattr(settings, 'GOOGLE_READ_TIMEOUT', 600)
+GOOGLE_GENERATE_URL = f"{GOOGLE_API_BASE}{GOOGLE_GENERATE_MODEL}:generateContent"
+
+# Shared keep-alive session so consecutive Gemini calls reuse one TLS connection;
+# the key rides in a header so it stays out of request URLs and error messages
+_session = requests.Session()
+if GOOGLE_API_KEY:
+    _session.headers["x-goog-api-key"] = GOOGLE_API_KEY
 
 
 def _google_generate(prompt: str) -> str:
     if not GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY is not configured")
 
-    url = f"{GOOGLE_API_BASE}{GOOGLE_GENERATE_MODEL}:generateContent?key={GOOGLE_API_KEY}"
     payload = {
         "contents": [
             {
@@ -29,21 +36,13 @@ def _google_generate(prompt: str) -> str:
             }
         ]
     }
-    response = requests.post(
-        url,
+    response = _session.post(
+        GOOGLE_GENERATE_URL,
         json=payload,
         timeout=(GOOGLE_CONNECT_TIMEOUT, GOOGLE_READ_TIMEOUT)
     )
     response.raise_for_status()
-    data = response.json()
-
-    text_parts: List[str] = []
-    for candidate in data.get("candidates", []):
-        for part in candidate.get("content", {}).get("parts", []):
-            part_text = part.get("text")
-            if part_text:
-                text_parts.append(part_text)
-    return "".join(text_parts).strip()
+    return parse_google_text(response.content)
 
 
 def _parse_points(text: str, max_points: int = 8) -> List[str]:
@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_schedules(sender, **kwargs):
+    """Register the periodic django-q jobs (idempotent; runs after every migrate)."""
+    from django_q.models import Schedule
+
+    Schedule.objects.update_or_create(
+        name='probe_google_health',
+        defaults={
+            'func': 'agora.tasks.probe_google_health',
+            'schedule_type': Schedule.MINUTES,
+            'minutes': 1,
+            'repeats': -1,
+        }
+    )
 
 
 class AgoraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agora'
+
+    def ready(self):
+        post_migrate.connect(ensure_schedules, sender=self)
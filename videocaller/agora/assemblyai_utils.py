@@ -3,11 +3,17 @@ import time
 import requests
 from django.conf import settings
 
+WEBHOOK_AUTH_HEADER = "X-AssemblyAI-Webhook-Secret"
+
+# Shared keep-alive session so repeated polls reuse one TLS connection
+_session = requests.Session()
+
 
 class AssemblyAIClient:
     def __init__(self):
         self.api_key = settings.ASSEMBLYAI_API_KEY
         self.base_url = "https://api.assemblyai.com/v2"
+        self.session = _session
 
     def _headers(self):
         return {
@@ -15,17 +21,23 @@ class AssemblyAIClient:
             "content-type": "application/json"
         }
 
-    def start_transcription(self, audio_url):
+    def start_transcription(self, audio_url, webhook_url=None, webhook_secret=None):
         payload = {
             "audio_url": audio_url,
             "language_detection": True
         }
-        response = requests.post(f"{self.base_url}/transcript", json=payload, headers=self._headers())
+        if webhook_url:
+            # AssemblyAI calls back when the transcript finishes instead of us polling
+            payload["webhook_url"] = webhook_url
+            if webhook_secret:
+                payload["webhook_auth_header_name"] = WEBHOOK_AUTH_HEADER
+                payload["webhook_auth_header_value"] = webhook_secret
+        response = self.session.post(f"{self.base_url}/transcript", json=payload, headers=self._headers())
         response.raise_for_status()
         return response.json()
 
     def get_transcription(self, transcript_id):
-        response = requests.get(f"{self.base_url}/transcript/{transcript_id}", headers=self._headers())
+        response = self.session.get(f"{self.base_url}/transcript/{transcript_id}", headers=self._headers())
         response.raise_for_status()
         return response.json()
 
@@ -0,0 +1,150 @@
+"""Write-behind buffer that batches dashboard chat inserts.
+
+Durability trade-off: a queued message is acknowledged to its sender before it is saved, and
+lives only in process memory until the next flush (about FLUSH_INTERVAL_SECONDS later). A clean
+shutdown flushes the queue (atexit, plus a SIGTERM handler when the server leaves SIGTERM at its
+default action). A SIGKILL, an OOM kill or a crash loses whatever is still queued. To bound
+that loss, submit() writes inline once SYNC_WRITE_DEPTH rows are pending.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+from typing import List, Tuple
+
+from django.db import close_old_connections
+
+from .models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 0.1
+MAX_BATCH_SIZE = 100
+# At most this many acknowledged-but-unsaved messages are held in memory
+SYNC_WRITE_DEPTH = 20
+
+
+class ChatWriteBuffer:
+    """Collects (user_id, content) pairs and bulk-inserts them from one background thread."""
+
+    def __init__(
+        self,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        batch_size: int = MAX_BATCH_SIZE,
+        sync_depth: int = SYNC_WRITE_DEPTH
+    ):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.sync_depth = sync_depth
+        self._queue: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, user_id: int, content: str) -> ChatMessage | None:
+        """Queue a message for the next batch, or save it inline once the backlog reaches sync_depth.
+
+        Returns the saved ChatMessage when it was written inline, None when it was queued.
+        An inline write that fails raises, so the caller never acknowledges a row that doesn't exist.
+        """
+        if self._queue.qsize() >= self.sync_depth:
+            return ChatMessage.objects.create(user_id=user_id, content=content)
+        self._ensure_worker()
+        self._queue.put((user_id, content))
+        return None
+
+    def flush(self) -> int:
+        """Write everything currently queued; returns the number of rows inserted."""
+        written = 0
+        while True:
+            batch = self._drain()
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="chat-write-buffer", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Keep collecting for one flush window (or until the batch is full)
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _drain(self, limit: int | None = None) -> List[Tuple[int, str]]:
+        limit = self.batch_size if limit is None else limit
+        items: List[Tuple[int, str]] = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _write(self, batch: List[Tuple[int, str]]) -> int:
+        close_old_connections()
+        try:
+            ChatMessage.objects.bulk_create(
+                [ChatMessage(user_id=user_id, content=content) for user_id, content in batch],
+                batch_size=self.batch_size
+            )
+            return len(batch)
+        except Exception as exc:
+            # Senders were already told "queued"; don't let one bad row (e.g. a deleted user) sink the batch
+            logger.warning("Bulk insert of %s chat messages failed, retrying row by row: %s", len(batch), exc)
+            return self._write_rows(batch)
+        finally:
+            close_old_connections()
+
+    def _write_rows(self, batch: List[Tuple[int, str]]) -> int:
+        written = 0
+        for user_id, content in batch:
+            try:
+                ChatMessage.objects.create(user_id=user_id, content=content)
+                written += 1
+            except Exception as exc:
+                logger.error("Dropping chat message from user %s: %s", user_id, exc)
+        return written
+
+
+def _install_sigterm_flush(buffer: ChatWriteBuffer) -> None:
+    """Flush on SIGTERM when it would otherwise kill the process without running atexit.
+
+    Servers that handle SIGTERM themselves (daphne's reactor, the django-q cluster) shut down
+    cleanly and atexit flushes the buffer, so their handlers are left alone.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if signal.getsignal(signal.SIGTERM) is not signal.SIG_DFL:
+        return
+
+    def handle_sigterm(signum, frame):
+        buffer.flush()
+        # Then die exactly as the default action would have
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+chat_write_buffer = ChatWriteBuffer()
+atexit.register(chat_write_buffer.flush)
+_install_sigterm_flush(chat_write_buffer)
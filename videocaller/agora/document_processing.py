@@ -11,7 +11,7 @@ from django.utils import timezone
 from .assemblyai_utils import AssemblyAIClient
 from .embedding_utils import chunk_transcript, store_document_chunks_in_vector_db
 from .models import DocumentUpload, DocumentChunk
-from .recording_utils import S3Manager
+from .recording_utils import get_s3_manager
 
 
 ALLOWED_EXTENSIONS = {".pdf", ".txt", ".doc", ".docx", ".mp3"}
@@ -172,7 +172,7 @@ class DocumentProcessorFactory:
         s3_error = None
         if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY and settings.AWS_STORAGE_BUCKET_NAME:
             try:
-                s3_manager = S3Manager()
+                s3_manager = get_s3_manager()
                 uploaded = s3_manager.upload_file(local_path, s3_key)
                 if uploaded:
                     s3_url = s3_manager.get_s3_url(s3_key)
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('agora', '0013_chatmessage_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meetingroom',
+            index=models.Index(fields=['is_active', '-created_at'], name='agora_room_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentupload',
+            index=models.Index(fields=['meeting', '-created_at'], name='agora_doc_meeting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentchunk',
+            index=models.Index(fields=['document', 'chunk_index'], name='agora_docchunk_order_idx'),
+        ),
+    ]
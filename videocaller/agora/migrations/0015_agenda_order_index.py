@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('agora', '0014_room_document_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meetingagendapoint',
+            index=models.Index(fields=['meeting', 'order', 'created_at'], name='agora_agenda_order_idx'),
+        ),
+    ]
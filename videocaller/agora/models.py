@@ -1,7 +1,26 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.functional import cached_property
 import uuid
 
+
+class MeetingRoomManager(models.Manager):
+    def with_meeting_state(self, *related):
+        """Join the recording/transcript/RAG-state rows (all three by default) so the get_*() accessors don't query"""
+        return self.select_related(*(related or ('recording', 'transcript', 'rag_state')))
+
+    def with_rag_readiness(self, meeting_id):
+        """Fetch a meeting with its RAG state and a has_doc_chunks flag in a single query"""
+        return (
+            self.filter(id=meeting_id)
+            .annotate(has_doc_chunks=models.Exists(
+                DocumentChunk.objects.filter(document__meeting=models.OuterRef('pk'))
+            ))
+            .select_related('rag_state')
+            .first()
+        )
+
+
 class MeetingRoom(models.Model):
     room_id = models.CharField(max_length=100, unique=True, default=uuid.uuid4)
     room_code = models.CharField(max_length=15, unique=True)  # Shareable code like "abc-def-ghi"
@@ -11,12 +30,22 @@ class MeetingRoom(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     max_participants = models.IntegerField(default=10)
+
+    objects = MeetingRoomManager()
     
     def __str__(self):
         return f"{self.title} - {self.room_code}"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', '-created_at'], name='agora_room_active_idx'),
+        ]
+
+    @cached_property
+    def channel_name(self):
+        """Agora channel name for this room (the room_id as a string)"""
+        return str(self.room_id)
 
     def get_recording(self):
         try:
@@ -90,6 +119,9 @@ class ChatMessage(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='agora_chat_created_idx'),
+        ]
 
 
 class TranscriptChunk(models.Model):
@@ -140,6 +172,9 @@ class DocumentUpload(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['meeting', '-created_at'], name='agora_doc_meeting_idx'),
+        ]
 
 
 class DocumentChunk(models.Model):
@@ -157,6 +192,9 @@ class DocumentChunk(models.Model):
 
     class Meta:
         ordering = ['document', 'chunk_index']
+        indexes = [
+            models.Index(fields=['document', 'chunk_index'], name='agora_docchunk_order_idx'),
+        ]
 
 
 class MeetingAgendaPoint(models.Model):
@@ -173,6 +211,9 @@ class MeetingAgendaPoint(models.Model):
 
     class Meta:
         ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(fields=['meeting', 'order', 'created_at'], name='agora_agenda_order_idx'),
+        ]
 
 
 class ConversationHistory(models.Model):
@@ -1,14 +1,20 @@
 """RAG (Retrieval-Augmented Generation) service for intelligent query responses"""
+import asyncio
 import json
 import logging
 import queue
 import threading
+import time
+import orjson
 from typing import Iterable, List, Dict, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
+from django.utils import timezone
 from asgiref.sync import sync_to_async
-from .embedding_utils import search_similar_chunks
-from .models import ConversationHistory
+from .embedding_utils import chunk_transcript, search_similar_chunks, store_chunks_in_vector_db
+from .models import ConversationHistory, MeetingRoom, TranscriptChunk
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +23,62 @@ GOOGLE_GENERATE_MODEL = getattr(settings, 'GOOGLE_GENERATE_MODEL', 'gemini-2.5-f
 GOOGLE_API_BASE = "https://generativelanguage.googleapis.com/v1beta/models/"
 GOOGLE_CONNECT_TIMEOUT = getattr(settings, 'GOOGLE_CONNECT_TIMEOUT', 10)
 GOOGLE_READ_TIMEOUT = getattr(settings, 'GOOGLE_READ_TIMEOUT', 600)
+GOOGLE_GENERATE_URL = f"{GOOGLE_API_BASE}{GOOGLE_GENERATE_MODEL}:generateContent"
+GOOGLE_STREAM_URL = f"{GOOGLE_API_BASE}{GOOGLE_GENERATE_MODEL}:streamGenerateContent"
 MAX_TOKENS = getattr(settings, 'GOOGLE_MAX_TOKENS', 1000)
 MAX_CONVERSATION_TURNS = 5  # Limit context window
 
 
+def _with_api_key(session: requests.Session) -> requests.Session:
+    # Sent as a header rather than ?key= so the key never shows up in URLs, exceptions or logs
+    if GOOGLE_API_KEY:
+        session.headers["x-goog-api-key"] = GOOGLE_API_KEY
+    return session
+
+
+# Shared keep-alive session so consecutive Gemini calls reuse one TLS connection
+_session = _with_api_key(requests.Session())
+
+# Models covered by /api/health/google/all/
+GOOGLE_HEALTH_MODELS = getattr(settings, 'GOOGLE_HEALTH_MODELS', [GOOGLE_GENERATE_MODEL])
+GOOGLE_PROBE_CONCURRENCY = 8  # matches the probe session's connection pool
+# Wall-clock cap for one health-check, retries included
+GOOGLE_HEALTH_DEADLINE = 20  # seconds
+# Failures are only cached briefly so a recovery shows up quickly
+GOOGLE_HEALTH_FAILURE_TTL = 2  # seconds
+GOOGLE_PROBE_RETRIES = 2
+GOOGLE_PROBE_BACKOFF = 0.25
+
+
+def google_health_cache_key(model_name: str) -> str:
+    """Cache slot for the latest health result of one model"""
+    return f"google_health:{model_name}"
+
+
+# Written by google_llm_health and the scheduled probe
+GOOGLE_HEALTH_CACHE_KEY = google_health_cache_key(GOOGLE_GENERATE_MODEL)
+
+
+def _build_probe_session():
+    # POST isn't retried by default; generateContent has no side effects, so allow it explicitly
+    # Retry-After is reported to the caller instead of slept on, so it can't stretch the deadline
+    retry = Retry(
+        total=GOOGLE_PROBE_RETRIES,
+        backoff_factor=GOOGLE_PROBE_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    session = _with_api_key(requests.Session())
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+# Keep-alive, retrying session for health probes
+_probe_session = _build_probe_session()
+
+
 def _build_google_prompt(system_prompt: str, conversation_context: List[Dict], query: str) -> str:
     parts: List[str] = ["SYSTEM:", system_prompt.strip()]
     if conversation_context:
@@ -34,11 +92,144 @@ def _build_google_prompt(system_prompt: str, conversation_context: List[Dict], q
     return "\n".join(parts)
 
 
+def parse_google_text(raw: bytes) -> str:
+    """Decode a generateContent response body and join its candidate text parts.
+
+    Raises ValueError (orjson.JSONDecodeError) on a malformed body.
+    """
+    data = orjson.loads(raw)
+    text_parts: List[str] = []
+    for candidate in data.get("candidates", []):
+        for part in candidate.get("content", {}).get("parts", []):
+            part_text = part.get("text")
+            if part_text:
+                text_parts.append(part_text)
+    return "".join(text_parts).strip()
+
+
+def _probe_timeout(deadline: float) -> Tuple[float, float]:
+    """Per-attempt (connect, read) timeout so every attempt plus backoff fits inside ``deadline``"""
+    backoff = sum(GOOGLE_PROBE_BACKOFF * 2 ** n for n in range(GOOGLE_PROBE_RETRIES))
+    per_attempt = max(deadline - backoff, 1) / (GOOGLE_PROBE_RETRIES + 1)
+    connect = min(GOOGLE_CONNECT_TIMEOUT, per_attempt / 3)
+    return connect, per_attempt - connect
+
+
+def probe_google(
+    model_name: str = GOOGLE_GENERATE_MODEL,
+    deadline: float = GOOGLE_HEALTH_DEADLINE
+) -> Tuple[Dict, int]:
+    """Run one tiny generateContent call within ``deadline`` seconds; returns (response dict, HTTP status)"""
+    url = (
+        GOOGLE_GENERATE_URL if model_name == GOOGLE_GENERATE_MODEL
+        else f"{GOOGLE_API_BASE}{model_name}:generateContent"
+    )
+    payload = {
+        "contents": [
+            {
+                "role": "user",
+                "parts": [{"text": "Reply with OK"}]
+            }
+        ],
+        "generationConfig": {
+            "candidateCount": 1,
+            "maxOutputTokens": 8,
+            "temperature": 0.0
+        }
+    }
+
+    started = time.time()
+    try:
+        # Not GOOGLE_READ_TIMEOUT: that is sized for long generations and would outlive the deadline
+        response = _probe_session.post(
+            url,
+            json=payload,
+            timeout=_probe_timeout(deadline)
+        )
+        response.raise_for_status()
+        output = parse_google_text(response.content)
+        latency_ms = int((time.time() - started) * 1000)
+        return {
+            'ok': True,
+            'model': model_name,
+            'latency_ms': latency_ms,
+            'output': output
+        }, 200
+    except requests.exceptions.ReadTimeout as e:
+        logger.error("Google health-check timed out: %s", str(e))
+        return {
+            'ok': False,
+            'model': model_name,
+            'error': 'Google request timed out'
+        }, 503
+    except requests.exceptions.RequestException as e:
+        status = getattr(e.response, "status_code", None)
+        body = getattr(e.response, "text", "")
+        logger.error("Google health-check failed (status=%s): %s", status, body[:1000])
+        data = {
+            'ok': False,
+            'model': model_name,
+            'error': 'Google request failed'
+        }
+        retry_after = e.response.headers.get("Retry-After") if e.response is not None else None
+        if retry_after:
+            data['retry_after'] = retry_after
+        return data, 503
+    except ValueError as e:
+        logger.error("Google health-check invalid JSON response: %s", str(e))
+        return {
+            'ok': False,
+            'model': model_name,
+            'error': 'Invalid JSON response from Google'
+        }, 503
+    except Exception as e:
+        logger.error("Google health-check unexpected error: %s", str(e))
+        return {
+            'ok': False,
+            'model': model_name,
+            'error': str(e)
+        }, 503
+
+
+async def probe_google_async(model_name: str, deadline: float) -> Tuple[Dict, int]:
+    """Run probe_google in a worker thread, giving up after ``deadline`` seconds
+
+    The socket timeouts inside probe_google are budgeted to the same deadline, so the
+    worker thread finishes at about the time wait_for stops waiting for it.
+    """
+    try:
+        return await asyncio.wait_for(
+            sync_to_async(probe_google, thread_sensitive=False)(model_name, deadline),
+            timeout=deadline
+        )
+    except asyncio.TimeoutError:
+        logger.error("Google health-check for %s exceeded %ss deadline", model_name, deadline)
+        return {
+            'ok': False,
+            'model': model_name,
+            'error': 'Google request timed out'
+        }, 503
+
+
+async def probe_all(
+    models: Iterable[str],
+    deadline: float,
+    concurrency: int = GOOGLE_PROBE_CONCURRENCY
+) -> List[Tuple[Dict, int]]:
+    """Probe several models concurrently (at most ``concurrency`` in flight); results keep input order"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe_one(model_name: str) -> Tuple[Dict, int]:
+        async with semaphore:
+            return await probe_google_async(model_name, deadline)
+
+    return await asyncio.gather(*(probe_one(model_name) for model_name in models))
+
+
 def _google_generate(prompt: str) -> str:
     if not GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY is not configured")
 
-    url = f"{GOOGLE_API_BASE}{GOOGLE_GENERATE_MODEL}:generateContent?key={GOOGLE_API_KEY}"
     payload = {
         "contents": [
             {
@@ -52,13 +243,13 @@ def _google_generate(prompt: str) -> str:
         }
     }
     try:
-        response = requests.post(
-            url,
+        response = _session.post(
+            GOOGLE_GENERATE_URL,
             json=payload,
             timeout=(GOOGLE_CONNECT_TIMEOUT, GOOGLE_READ_TIMEOUT)
         )
         response.raise_for_status()
-        data = response.json()
+        return parse_google_text(response.content)
     except requests.exceptions.ReadTimeout as e:
         logger.error("Google generate timed out: %s", str(e))
         raise
@@ -71,20 +262,11 @@ def _google_generate(prompt: str) -> str:
         logger.error("Google generate invalid JSON response: %s", str(e))
         raise
 
-    text_parts: List[str] = []
-    for candidate in data.get("candidates", []):
-        for part in candidate.get("content", {}).get("parts", []):
-            part_text = part.get("text")
-            if part_text:
-                text_parts.append(part_text)
-    return "".join(text_parts).strip()
-
 
 def _google_generate_stream(prompt: str) -> Iterable[str]:
     if not GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY is not configured")
 
-    url = f"{GOOGLE_API_BASE}{GOOGLE_GENERATE_MODEL}:streamGenerateContent?key={GOOGLE_API_KEY}"
     payload = {
         "contents": [
             {
@@ -98,8 +280,8 @@ def _google_generate_stream(prompt: str) -> Iterable[str]:
         }
     }
     try:
-        with requests.post(
-            url,
+        with _session.post(
+            GOOGLE_STREAM_URL,
             json=payload,
             stream=True,
             timeout=(GOOGLE_CONNECT_TIMEOUT, GOOGLE_READ_TIMEOUT)
@@ -194,7 +376,6 @@ def _save_conversation_turn(
         return
 
     try:
-        from .models import MeetingRoom
         meeting = MeetingRoom.objects.get(id=meeting_id)
         ConversationHistory.objects.create(
             meeting=meeting,
@@ -207,6 +388,25 @@ def _save_conversation_turn(
         logger.error(f"Error saving conversation history: {str(e)}")
 
 
+def _build_rag_prompt(relevant_chunks: List[Dict], conversation_context: List[Dict], query: str) -> str:
+    chunks_text = "\n\n".join([
+        f"[Source: {chunk.get('source_type', 'meeting_transcript')}, "
+        f"Chunk {chunk['chunk_index']}, "
+        f"Doc: {chunk.get('document_name', 'N/A')}] {chunk['text']}"
+        for chunk in relevant_chunks
+    ])
+    system_prompt = f"""You are a helpful assistant answering questions from meeting transcripts and uploaded documents. 
+        
+You have access to relevant parts of a transcript provided below. Use this context to answer user questions accurately and concisely.
+If the information is not in the provided context, say you don't have that information from the transcript.
+
+RELEVANT TRANSCRIPT SECTIONS:
+{chunks_text}
+
+Answer the user's question based ONLY on the provided transcript sections. Be specific and cite which part of the transcript you're referring to when possible."""
+    return _build_google_prompt(system_prompt, conversation_context, query)
+
+
 def generate_rag_response(
     meeting_id: int | None,
     user_id: int,
@@ -236,31 +436,13 @@ def generate_rag_response(
         # Step 2: Get conversation history for context
         conversation_context = get_conversation_context(meeting_id, user_id)
         
-        # Step 3: Build system prompt
-        chunks_text = "\n\n".join([
-            f"[Source: {chunk.get('source_type', 'meeting_transcript')}, "
-            f"Chunk {chunk['chunk_index']}, "
-            f"Doc: {chunk.get('document_name', 'N/A')}] {chunk['text']}"
-            for chunk in relevant_chunks
-        ])
-        
-        system_prompt = f"""You are a helpful assistant answering questions from meeting transcripts and uploaded documents. 
-        
-You have access to relevant parts of a transcript provided below. Use this context to answer user questions accurately and concisely.
-If the information is not in the provided context, say you don't have that information from the transcript.
-
-RELEVANT TRANSCRIPT SECTIONS:
-{chunks_text}
-
-Answer the user's question based ONLY on the provided transcript sections. Be specific and cite which part of the transcript you're referring to when possible."""
-        
-        # Step 4: Build prompt for Google
-        prompt = _build_google_prompt(system_prompt, conversation_context, query)
+        # Step 3: Build prompt for Google
+        prompt = _build_rag_prompt(relevant_chunks, conversation_context, query)
 
-        # Step 5: Call Google
+        # Step 4: Call Google
         assistant_response = _google_generate(prompt)
 
-        # Step 6: Save conversation turn (for next context)
+        # Step 5: Save conversation turn (for next context)
         _save_conversation_turn(meeting_id, user_id, query, assistant_response, relevant_chunks)
         
         return assistant_response, relevant_chunks
@@ -283,23 +465,7 @@ def stream_rag_response(
             return iter(["Sorry, I couldn't find relevant information in the available documents or transcripts."]), []
 
         conversation_context = get_conversation_context(meeting_id, user_id)
-        chunks_text = "\n\n".join([
-            f"[Source: {chunk.get('source_type', 'meeting_transcript')}, "
-            f"Chunk {chunk['chunk_index']}, "
-            f"Doc: {chunk.get('document_name', 'N/A')}] {chunk['text']}"
-            for chunk in relevant_chunks
-        ])
-        system_prompt = f"""You are a helpful assistant answering questions from meeting transcripts and uploaded documents. 
-        
-You have access to relevant parts of a transcript provided below. Use this context to answer user questions accurately and concisely.
-If the information is not in the provided context, say you don't have that information from the transcript.
-
-RELEVANT TRANSCRIPT SECTIONS:
-{chunks_text}
-
-Answer the user's question based ONLY on the provided transcript sections. Be specific and cite which part of the transcript you're referring to when possible."""
-
-        prompt = _build_google_prompt(system_prompt, conversation_context, query)
+        prompt = _build_rag_prompt(relevant_chunks, conversation_context, query)
 
         def generator() -> Iterable[str]:
             yield "Thinking...\n"
@@ -323,29 +489,15 @@ async def stream_rag_response_async(
     top_k: int = 5
 ) -> Tuple[Iterable[str], List[Dict]]:
     try:
-        relevant_chunks = await sync_to_async(search_similar_chunks)(query, meeting_id, top_k)
+        # The vector search is Qdrant + embedding HTTP only, so it can skip the sync thread queue;
+        # ORM calls stay thread-sensitive so close_old_connections() still manages their connection
+        relevant_chunks = await sync_to_async(search_similar_chunks, thread_sensitive=False)(query, meeting_id, top_k)
 
         if not relevant_chunks:
             return iter(["Sorry, I couldn't find relevant information in the available documents or transcripts."]), []
 
         conversation_context = await sync_to_async(get_conversation_context)(meeting_id, user_id)
-        chunks_text = "\n\n".join([
-            f"[Source: {chunk.get('source_type', 'meeting_transcript')}, "
-            f"Chunk {chunk['chunk_index']}, "
-            f"Doc: {chunk.get('document_name', 'N/A')}] {chunk['text']}"
-            for chunk in relevant_chunks
-        ])
-        system_prompt = f"""You are a helpful assistant answering questions from meeting transcripts and uploaded documents. 
-        
-You have access to relevant parts of a transcript provided below. Use this context to answer user questions accurately and concisely.
-If the information is not in the provided context, say you don't have that information from the transcript.
-
-RELEVANT TRANSCRIPT SECTIONS:
-{chunks_text}
-
-Answer the user's question based ONLY on the provided transcript sections. Be specific and cite which part of the transcript you're referring to when possible."""
-
-        prompt = _build_google_prompt(system_prompt, conversation_context, query)
+        prompt = _build_rag_prompt(relevant_chunks, conversation_context, query)
         token_queue: queue.Queue = queue.Queue()
         stop_marker = object()
 
@@ -379,6 +531,31 @@ Answer the user's question based ONLY on the provided transcript sections. Be sp
         raise
 
 
+async def generate_rag_response_async(
+    meeting_id: int | None,
+    user_id: int,
+    query: str,
+    top_k: int = 5
+) -> Tuple[str, List[Dict]]:
+    """Async generate_rag_response: only the Qdrant search and the Gemini call leave the sync thread"""
+    try:
+        relevant_chunks = await sync_to_async(search_similar_chunks, thread_sensitive=False)(query, meeting_id, top_k)
+
+        if not relevant_chunks:
+            logger.warning(f"No relevant chunks found for meeting {meeting_id}, query: {query}")
+            return "Sorry, I couldn't find relevant information in the available documents or transcripts.", []
+
+        conversation_context = await sync_to_async(get_conversation_context)(meeting_id, user_id)
+        prompt = _build_rag_prompt(relevant_chunks, conversation_context, query)
+        assistant_response = await sync_to_async(_google_generate, thread_sensitive=False)(prompt)
+        await sync_to_async(_save_conversation_turn)(meeting_id, user_id, query, assistant_response, relevant_chunks)
+
+        return assistant_response, relevant_chunks
+    except Exception as e:
+        logger.error(f"Error generating RAG response (async): {str(e)}")
+        raise
+
+
 def process_transcript_for_rag(meeting_id: int) -> Dict:
     """
     Process a completed transcript: chunk it and generate embeddings
@@ -390,11 +567,7 @@ def process_transcript_for_rag(meeting_id: int) -> Dict:
         Dict with processing status and chunk count
     """
     try:
-        from .models import MeetingRoom, TranscriptChunk
-        from .embedding_utils import chunk_transcript, store_chunks_in_vector_db
-        from django.utils import timezone
-        
-        meeting = MeetingRoom.objects.get(id=meeting_id)
+        meeting = MeetingRoom.objects.with_meeting_state('transcript', 'rag_state').get(id=meeting_id)
         transcript = meeting.get_transcript()
         rag_state = meeting.get_rag_state()
         
@@ -427,7 +600,7 @@ def process_transcript_for_rag(meeting_id: int) -> Dict:
         # Step 4: Update meeting status
         rag_state.chunks_created_at = timezone.now()
         rag_state.embeddings_created_at = timezone.now()
-        rag_state.save()
+        rag_state.save(update_fields=['chunks_created_at', 'embeddings_created_at'])
         
         return {
             "success": True,
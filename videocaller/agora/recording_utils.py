@@ -4,11 +4,132 @@ Agora Cloud Recording utilities for managing recording lifecycle and S3 uploads
 import os
 import time
 import base64
+import random
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import orjson
 import requests
 import boto3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from django.conf import settings
 from botocore.exceptions import ClientError
 
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeout applied to every Agora REST call
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Recording bot UIDs reserve the 0x3B high byte; the low 24 bits carry the room id.
+# Participant UIDs are Django user ids and stay far below this range.
+RECORDING_UID_MARKER = 0x3B000000
+RECORDING_UID_MASK = 0x00FFFFFF
+
+
+def recording_bot_uid(room_id):
+    """Agora UID for the cloud recording bot of a room"""
+    return (room_id & RECORDING_UID_MASK) | RECORDING_UID_MARKER
+
+
+def is_recording_bot_uid(uid):
+    """True if ``uid`` was produced by recording_bot_uid()"""
+    return uid & 0xFF000000 == RECORDING_UID_MARKER
+
+
+class _JitteredRetry(Retry):
+    """Retry with random jitter added to the exponential backoff.
+
+    urllib3 1.26 (pinned through botocore) has no ``backoff_jitter`` option, so
+    spread the retries out here to avoid synchronized retry storms.
+    """
+
+    BACKOFF_JITTER = 0.3
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.BACKOFF_JITTER)
+
+
+def _build_agora_session():
+    # acquire/start/stop are not idempotent: a POST whose response was lost may already have
+    # started a session, so POSTs are only retried on connect errors (the request never left).
+    # Status and read retries apply to the query GET alone.
+    retry = _JitteredRetry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist={429, 500, 502, 503, 504},
+        allowed_methods={"GET"},
+        raise_on_status=False
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retry))
+    return session
+
+
+# Shared keep-alive session for the Agora Cloud Recording API
+_agora_session = _build_agora_session()
+
+@lru_cache(maxsize=4)
+def _get_s3_client(access_key_id, secret_access_key, region_name):
+    """Build (once per credential set) a thread-safe boto3 S3 client."""
+    return boto3.client(
+        's3',
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_access_key,
+        region_name=region_name,
+        config=Config(
+            max_pool_connections=50,
+            tcp_keepalive=True,
+            retries={'max_attempts': 3, 'mode': 'adaptive'}
+        )
+    )
+
+
+@lru_cache(maxsize=1024)
+def _presign_get(s3_client, bucket_name, s3_key, expiration, window):
+    """Presigned GET URL, reused for every call inside the same ``window`` (errors are not cached)."""
+    return s3_client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket_name, 'Key': s3_key},
+        ExpiresIn=expiration
+    )
+
+
+# check_file_exists results, keyed by (bucket, key) -> (exists, checked_at)
+_EXISTS_CACHE = OrderedDict()
+_EXISTS_CACHE_LOCK = threading.Lock()
+_EXISTS_CACHE_MAX_SIZE = 1024
+_EXISTS_POSITIVE_TTL = 30
+_EXISTS_NEGATIVE_TTL = 2
+
+# Region mapping for S3
+_S3_REGION_CODES = {
+    'us-east-1': 0, 'us-east-2': 1, 'us-west-1': 2, 'us-west-2': 3,
+    'eu-west-1': 4, 'eu-west-2': 5, 'eu-west-3': 6, 'eu-central-1': 7,
+    'ap-southeast-1': 8, 'ap-southeast-2': 9, 'ap-northeast-1': 10,
+    'ap-northeast-2': 11, 'sa-east-1': 12, 'ca-central-1': 13,
+    'ap-south-1': 14, 'cn-north-1': 15, 'cn-northwest-1': 16
+}
+
+# Constant part of the start-recording clientRequest; only token and storageConfig vary per call
+_START_RECORDING_TEMPLATE = {
+    "recordingConfig": {
+        "maxIdleTime": 30,
+        "streamTypes": 2,  # 0=audio, 1=video, 2=both
+        "channelType": 0,  # 0=communication, 1=live broadcast
+        "videoStreamType": 0,  # 0=high stream, 1=low stream
+        "subscribeUidGroup": 0  # Record all users
+    },
+    "recordingFileConfig": {
+        "avFileType": ["hls", "mp4"]  # HLS for live, MP4 for download
+    }
+}
 
 class AgoraCloudRecording:
     """Handles Agora Cloud Recording API operations"""
@@ -27,6 +148,7 @@ class AgoraCloudRecording:
             'CN': 'https://api-cn.agora.io/v1/apps'
         }
         self.base_url = region_map.get(self.region, region_map['NA'])
+        self.session = _agora_session
         
     def _get_auth_header(self):
         """Generate Basic Auth header for Agora API"""
@@ -57,7 +179,7 @@ class AgoraCloudRecording:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_auth_header())
+            response = self.session.post(url, json=payload, headers=self._get_auth_header(), timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             return {
@@ -90,33 +212,15 @@ class AgoraCloudRecording:
         """
         url = f"{self.base_url}/{self.app_id}/cloud_recording/resourceid/{resource_id}/mode/mix/start"
         
-        # Region mapping for S3
-        region_code_map = {
-            'us-east-1': 0, 'us-east-2': 1, 'us-west-1': 2, 'us-west-2': 3,
-            'eu-west-1': 4, 'eu-west-2': 5, 'eu-west-3': 6, 'eu-central-1': 7,
-            'ap-southeast-1': 8, 'ap-southeast-2': 9, 'ap-northeast-1': 10,
-            'ap-northeast-2': 11, 'sa-east-1': 12, 'ca-central-1': 13,
-            'ap-south-1': 14, 'cn-north-1': 15, 'cn-northwest-1': 16
-        }
-        
         payload = {
             "cname": channel_name,
             "uid": str(uid),
             "clientRequest": {
                 "token": token,
-                "recordingConfig": {
-                    "maxIdleTime": 30,
-                    "streamTypes": 2,  # 0=audio, 1=video, 2=both
-                    "channelType": 0,  # 0=communication, 1=live broadcast
-                    "videoStreamType": 0,  # 0=high stream, 1=low stream
-                    "subscribeUidGroup": 0  # Record all users
-                },
-                "recordingFileConfig": {
-                    "avFileType": ["hls", "mp4"]  # HLS for live, MP4 for download
-                },
+                **_START_RECORDING_TEMPLATE,
                 "storageConfig": {
                     "vendor": 1,  # 1=AWS S3, 2=Alibaba Cloud, 3=Tencent Cloud
-                    "region": region_code_map.get(bucket_region, 0),
+                    "region": _S3_REGION_CODES.get(bucket_region, 0),
                     "bucket": bucket_name,
                     "accessKey": bucket_access_key,
                     "secretKey": bucket_secret_key,
@@ -126,7 +230,9 @@ class AgoraCloudRecording:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_auth_header())
+            response = self.session.post(
+                url, data=orjson.dumps(payload), headers=self._get_auth_header(), timeout=DEFAULT_TIMEOUT
+            )
             response.raise_for_status()
             data = response.json()
             return {
@@ -163,7 +269,7 @@ class AgoraCloudRecording:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_auth_header())
+            response = self.session.post(url, json=payload, headers=self._get_auth_header(), timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             return {
@@ -190,7 +296,7 @@ class AgoraCloudRecording:
         url = f"{self.base_url}/{self.app_id}/cloud_recording/resourceid/{resource_id}/sid/{sid}/mode/mix/query"
         
         try:
-            response = requests.get(url, headers=self._get_auth_header())
+            response = self.session.get(url, headers=self._get_auth_header(), timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             return {
@@ -208,13 +314,19 @@ class S3Manager:
     """Handles AWS S3 operations for recordings"""
     
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_S3_REGION_NAME
+        # Client creation loads the service model and wires the event system, which
+        # dwarfs the cost of signing a URL, so every S3Manager shares one client
+        self.s3_client = _get_s3_client(
+            settings.AWS_ACCESS_KEY_ID,
+            settings.AWS_SECRET_ACCESS_KEY,
+            settings.AWS_S3_REGION_NAME
         )
         self.bucket_name = settings.AWS_STORAGE_BUCKET_NAME
+        self._upload_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            use_threads=True
+        )
     
     def generate_presigned_url(self, s3_key, expiration=3600):
         """
@@ -227,16 +339,17 @@ class S3Manager:
         Returns:
             str: Presigned URL or None if error
         """
+        started = time.perf_counter()
+        # Reuse a URL for half its lifetime, so a cached URL always has >= expiration/2 left
+        window = int(time.time()) // max(expiration // 2, 1)
         try:
-            url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': s3_key},
-                ExpiresIn=expiration
-            )
-            return url
-        except ClientError as e:
-            print(f"Error generating presigned URL: {e}")
+            url = _presign_get(self.s3_client, self.bucket_name, s3_key, expiration, window)
+        except ClientError:
+            logger.exception("S3 presign failed for key=%s", s3_key)
             return None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("S3 presign key=%s took %.1fms", s3_key, (time.perf_counter() - started) * 1000)
+        return url
     
     def upload_file(self, file_path, s3_key):
         """
@@ -249,12 +362,45 @@ class S3Manager:
         Returns:
             bool: True if successful, False otherwise
         """
+        started = time.perf_counter()
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
-            return True
-        except ClientError as e:
-            print(f"Error uploading to S3: {e}")
+            self.s3_client.upload_file(file_path, self.bucket_name, s3_key, Config=self._upload_config)
+        except ClientError:
+            logger.exception("S3 upload failed for key=%s", s3_key)
             return False
+        self._cache_exists(s3_key, True)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("S3 upload key=%s took %.1fms", s3_key, (time.perf_counter() - started) * 1000)
+        return True
+    
+    def upload_fileobj(self, fileobj, s3_key, content_type=None):
+        """
+        Upload a file-like object to S3 without spilling it to local disk first
+        
+        Args:
+            fileobj: Readable binary file-like object (e.g. an uploaded file)
+            s3_key: S3 object key
+            content_type: Optional Content-Type to store with the object
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        started = time.perf_counter()
+        try:
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': content_type} if content_type else None,
+                Config=self._upload_config
+            )
+        except ClientError:
+            logger.exception("S3 upload failed for key=%s", s3_key)
+            return False
+        self._cache_exists(s3_key, True)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("S3 upload key=%s took %.1fms", s3_key, (time.perf_counter() - started) * 1000)
+        return True
     
     def get_s3_url(self, s3_key):
         """
@@ -272,14 +418,48 @@ class S3Manager:
         """
         Check if a file exists in S3
         
+        Results are cached per process for a short TTL (30s when found, 2s when
+        missing) so repeated checks for the same key skip the HEAD request.
+        
         Args:
             s3_key: S3 object key
             
         Returns:
             bool: True if exists, False otherwise
         """
+        cache_key = (self.bucket_name, s3_key)
+        with _EXISTS_CACHE_LOCK:
+            cached = _EXISTS_CACHE.get(cache_key)
+        if cached is not None:
+            exists, checked_at = cached
+            ttl = _EXISTS_POSITIVE_TTL if exists else _EXISTS_NEGATIVE_TTL
+            if time.monotonic() - checked_at < ttl:
+                return exists
+        
         try:
             self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-            return True
+            exists = True
         except ClientError:
-            return False
+            exists = False
+        self._cache_exists(s3_key, exists)
+        return exists
+    
+    def _cache_exists(self, s3_key, exists):
+        cache_key = (self.bucket_name, s3_key)
+        with _EXISTS_CACHE_LOCK:
+            _EXISTS_CACHE[cache_key] = (exists, time.monotonic())
+            _EXISTS_CACHE.move_to_end(cache_key)
+            while len(_EXISTS_CACHE) > _EXISTS_CACHE_MAX_SIZE:
+                _EXISTS_CACHE.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def get_cloud_recording():
+    """Process-wide AgoraCloudRecording, built on first use"""
+    return AgoraCloudRecording()
+
+
+@lru_cache(maxsize=1)
+def get_s3_manager():
+    """Process-wide S3Manager, built on first use"""
+    return S3Manager()
@@ -1,17 +1,55 @@
-"""Background tasks for document processing."""
+"""Background tasks for document and recording processing."""
 from __future__ import annotations
 
 import logging
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage
+from django.urls import reverse
 from django.utils import timezone
+from django_q.tasks import async_task
 
+from .assemblyai_utils import AssemblyAIClient
 from .document_processing import DocumentProcessorFactory
-from .models import DocumentUpload
+from .models import DocumentUpload, MeetingRoom, MeetingTranscript
+from .rag_utils import (
+    GOOGLE_API_KEY, GOOGLE_HEALTH_CACHE_KEY, GOOGLE_HEALTH_DEADLINE, GOOGLE_HEALTH_FAILURE_TTL, probe_google
+)
+from .recording_utils import S3Manager, get_s3_manager
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for overlapping independent S3 calls inside a task
+_io_pool = ThreadPoolExecutor(max_workers=4)
+
+UPLOAD_ATTEMPTS = 3
+
+# Outlives the one-minute probe schedule so the cached status never lapses between runs
+GOOGLE_HEALTH_PROBE_TTL = 90  # seconds
+
+# Settings are read once when the worker imports this module
+S3_CONFIGURED = bool(
+    settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY and settings.AWS_STORAGE_BUCKET_NAME
+)
+ASSEMBLYAI_API_KEY = settings.ASSEMBLYAI_API_KEY
+ASSEMBLYAI_WEBHOOK_SECRET = settings.ASSEMBLYAI_WEBHOOK_SECRET
+SITE_URL = settings.SITE_URL.rstrip('/') if settings.SITE_URL else ''
+
+
+def _upload_with_retry(s3_manager: S3Manager, full_path: str, s3_key: str, content_type: str) -> bool:
+    """Upload a local file to S3, retrying with exponential backoff (1s, 2s)."""
+    for attempt in range(UPLOAD_ATTEMPTS):
+        with open(full_path, "rb") as fileobj:
+            if s3_manager.upload_fileobj(fileobj, s3_key, content_type=content_type):
+                return True
+        if attempt < UPLOAD_ATTEMPTS - 1:
+            time.sleep(2 ** attempt)
+    return False
+
 
 def process_document_upload(document_id: int) -> None:
     try:
@@ -59,3 +97,147 @@ def process_document_upload(document_id: int) -> None:
         document.status = "failed"
         document.error_message = str(exc)
         document.save(update_fields=["status", "error_message"])
+
+
+def _assemblyai_webhook_url() -> str | None:
+    # The webhook endpoint rejects unsigned calls, so only register it when a secret is set
+    if not SITE_URL or not ASSEMBLYAI_WEBHOOK_SECRET:
+        return None
+    return f"{SITE_URL}{reverse('assemblyai_webhook')}"
+
+
+def process_recording_upload(meeting_id: int, storage_path: str) -> None:
+    """Upload a saved meeting recording to S3 and queue its transcription."""
+    try:
+        room = MeetingRoom.objects.with_meeting_state('recording').get(id=meeting_id)
+    except MeetingRoom.DoesNotExist:
+        logger.error("Meeting %s not found for recording %s", meeting_id, storage_path)
+        return
+
+    recording = room.get_recording()
+    full_path = default_storage.path(storage_path)
+    s3_key = f"recordings/{storage_path.split('/')[-1]}"
+    logger.info("Starting recording processing: meeting=%s path=%s", room.id, storage_path)
+
+    s3_url = None
+    presigned_url = None
+    if S3_CONFIGURED:
+        try:
+            s3_manager = get_s3_manager()
+            # Presigning is local signing work, so overlap it with the upload
+            upload_future = _io_pool.submit(_upload_with_retry, s3_manager, full_path, s3_key, "audio/webm")
+            presign_future = _io_pool.submit(s3_manager.generate_presigned_url, s3_key)
+            if upload_future.result():
+                s3_url = s3_manager.get_s3_url(s3_key)
+                presigned_url = presign_future.result()
+                recording.s3_recording_url = s3_url
+                recording.save(update_fields=["s3_recording_url"])
+            else:
+                logger.error("S3 upload failed for recording %s", storage_path)
+        except Exception as exc:
+            logger.error("S3 upload failed for recording %s: %s", storage_path, exc)
+
+    audio_url = presigned_url or s3_url
+    if ASSEMBLYAI_API_KEY and audio_url:
+        # Transcription gets its own task so this worker is free as soon as the upload is done
+        async_task("agora.tasks.transcribe_and_index", room.id, audio_url)
+    else:
+        MeetingTranscript.objects.filter(meeting=room).update(
+            transcript_status="not_started", transcript_id=None, transcript_text=None
+        )
+
+    logger.info("Completed recording upload: meeting=%s s3=%s", room.id, bool(s3_url))
+
+
+def transcribe_and_index(meeting_id: int, audio_url: str) -> None:
+    """Transcribe a recording with AssemblyAI (use a presigned URL for private buckets) and queue RAG indexing."""
+    try:
+        room = MeetingRoom.objects.with_meeting_state('transcript').get(id=meeting_id)
+    except MeetingRoom.DoesNotExist:
+        logger.error("Meeting %s not found for transcription", meeting_id)
+        return
+
+    transcript = room.get_transcript()
+    transcript.transcript_text = None
+    transcript.transcript_id = None
+    try:
+        assembly_client = AssemblyAIClient()
+        webhook_url = _assemblyai_webhook_url()
+        start_data = assembly_client.start_transcription(
+            audio_url,
+            webhook_url=webhook_url,
+            webhook_secret=ASSEMBLYAI_WEBHOOK_SECRET
+        )
+        transcript.transcript_id = start_data.get("id")
+        transcript.transcript_status = start_data.get("status", "processing")
+
+        if webhook_url:
+            # Completion arrives through assemblyai_webhook -> finalize_transcription
+            transcript.transcript_status = "processing"
+        elif transcript.transcript_id:
+            # No public SITE_URL or webhook secret (e.g. local dev), so fall back to polling
+            result = assembly_client.wait_for_transcription(
+                transcript.transcript_id, timeout_seconds=60, poll_interval=3
+            )
+            transcript.transcript_status = result.get("status", transcript.transcript_status)
+            if transcript.transcript_status == "completed":
+                transcript.transcript_text = result.get("text")
+            elif transcript.transcript_status == "failed":
+                logger.error("Transcription failed for meeting %s: %s", room.id, result.get("error"))
+    except Exception as exc:
+        logger.error("Transcription failed for meeting %s: %s", room.id, exc)
+        transcript.transcript_status = "failed"
+
+    transcript.save(update_fields=["transcript_text", "transcript_status", "transcript_id"])
+
+    if transcript.transcript_status == "completed" and transcript.transcript_text:
+        async_task("agora.rag_utils.process_transcript_for_rag", room.id)
+
+    logger.info("Transcription step finished: meeting=%s status=%s", room.id, transcript.transcript_status)
+
+
+def finalize_transcription(transcript_id: str) -> None:
+    """Fetch a finished AssemblyAI transcript reported by the webhook and queue RAG indexing."""
+    try:
+        transcript = MeetingTranscript.objects.get(transcript_id=transcript_id)
+    except MeetingTranscript.DoesNotExist:
+        logger.error("No meeting transcript for AssemblyAI id %s", transcript_id)
+        return
+
+    try:
+        result = AssemblyAIClient().get_transcription(transcript_id)
+    except Exception as exc:
+        logger.error("Fetching transcript %s failed: %s", transcript_id, exc)
+        transcript.transcript_status = "failed"
+        transcript.save(update_fields=["transcript_status"])
+        return
+
+    status = result.get("status")
+    if status == "completed":
+        transcript.transcript_status = "completed"
+        transcript.transcript_text = result.get("text")
+    elif status in ("error", "failed"):
+        logger.error("Transcription %s failed: %s", transcript_id, result.get("error"))
+        transcript.transcript_status = "failed"
+    else:
+        logger.info("Transcript %s not finished yet (status=%s)", transcript_id, status)
+        return
+
+    transcript.save(update_fields=["transcript_status", "transcript_text"])
+
+    if transcript.transcript_status == "completed" and transcript.transcript_text:
+        async_task("agora.rag_utils.process_transcript_for_rag", transcript.meeting_id)
+
+
+def probe_google_health() -> None:
+    """Scheduled Gemini health probe; web processes serve its result from the shared cache."""
+    if not GOOGLE_API_KEY:
+        return
+    # Bounded by the health deadline so a stalled Gemini can't pin one of the two cluster workers
+    data, status = probe_google(deadline=GOOGLE_HEALTH_DEADLINE)
+    cache.set(
+        GOOGLE_HEALTH_CACHE_KEY, (data, status),
+        GOOGLE_HEALTH_PROBE_TTL if data["ok"] else GOOGLE_HEALTH_FAILURE_TTL
+    )
+    if not data["ok"]:
+        logger.warning("Scheduled Google health probe failed: %s", data.get("error"))
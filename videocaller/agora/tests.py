@@ -1,3 +1,142 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .assemblyai_utils import WEBHOOK_AUTH_HEADER
+from .chat_buffer import ChatWriteBuffer
+from .models import ChatMessage, MeetingAgendaPoint, MeetingRoom
+from .tasks import _assemblyai_webhook_url
+from .views import generate_room_code
+
+
+class JoinRoomTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='host', password='pass')
+        self.client.force_login(self.user)
+
+    def test_accepts_both_room_code_shapes(self):
+        for code in ('abc-def-ghi', 'abc-d-ghi', generate_room_code()):
+            MeetingRoom.objects.create(room_code=code, host=self.user, title=code)
+            response = self.client.post(reverse('join_room'), {'room_code': code})
+            self.assertRedirects(
+                response, reverse('meeting', args=[code]), fetch_redirect_response=False
+            )
+
+    def test_rejects_malformed_code(self):
+        for code in ('', 'abc', 'ABC-DEF-GHI', 'abc-defg-hij', 'abc--ghi'):
+            response = self.client.post(reverse('join_room'), {'room_code': code})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['error'], 'Invalid code format')
+
+    def test_inactive_room_is_not_found(self):
+        MeetingRoom.objects.create(room_code='abc-def-ghi', host=self.user, is_active=False)
+        response = self.client.post(reverse('join_room'), {'room_code': 'abc-def-ghi'})
+        self.assertEqual(response.context['error'], 'Room not found or inactive')
+
+
+class AgendaTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='host', password='pass')
+        self.client.force_login(self.user)
+        self.meeting = MeetingRoom.objects.create(room_code='abc-d-ghi', host=self.user, title='Sync')
+        self.points = [
+            MeetingAgendaPoint.objects.create(meeting=self.meeting, text=f'Point {order}', order=order)
+            for order in range(1, 5)
+        ]
+
+    def test_delete_resequences_remaining_points(self):
+        deleted = self.points[1]
+        response = self.client.post(reverse('delete_agenda_point', args=[self.meeting.id, deleted.id]))
+        self.assertEqual(response.status_code, 200)
+
+        expected = [(point.id, idx) for idx, point in enumerate(self.points[:1] + self.points[2:], start=1)]
+        self.assertEqual([(item['id'], item['order']) for item in response.json()['points']], expected)
+        self.assertEqual(
+            list(MeetingAgendaPoint.objects.filter(meeting=self.meeting).values_list('id', 'order')),
+            expected
+        )
+
+    def test_delete_unknown_point_is_404(self):
+        other = MeetingRoom.objects.create(room_code='xyz-w-uvt', host=self.user)
+        foreign = MeetingAgendaPoint.objects.create(meeting=other, text='Elsewhere', order=1)
+        response = self.client.post(reverse('delete_agenda_point', args=[self.meeting.id, foreign.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(MeetingAgendaPoint.objects.filter(id=foreign.id).exists())
+        self.assertEqual(MeetingAgendaPoint.objects.filter(meeting=self.meeting).count(), 4)
+
+    def test_add_point_appends_after_highest_order(self):
+        response = self.client.post(
+            reverse('meeting_agenda', args=[self.meeting.id]),
+            data='{"text": "Wrap up"}',
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['order'], 5)
+
+
+# The buffer writes in autocommit mode (FK violations surface at commit), so no wrapping transaction
+class ChatWriteBufferTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chatter', password='pass')
+
+    def test_bad_row_does_not_drop_the_batch(self):
+        buffer = ChatWriteBuffer()
+        written = buffer._write([(self.user.id, 'good1'), (self.user.id + 999, 'bad'), (self.user.id, 'good2')])
+        self.assertEqual(written, 2)
+        self.assertEqual(
+            sorted(ChatMessage.objects.values_list('content', flat=True)), ['good1', 'good2']
+        )
+
+    def test_submit_writes_inline_past_sync_depth(self):
+        buffer = ChatWriteBuffer(sync_depth=0)
+        message = buffer.submit(self.user.id, 'hello')
+        self.assertIsNotNone(message)
+        self.assertTrue(ChatMessage.objects.filter(id=message.id, content='hello').exists())
+
+    def test_flush_writes_queued_messages(self):
+        # Queue directly so no background worker races the explicit flush
+        buffer = ChatWriteBuffer()
+        for idx in range(3):
+            buffer._queue.put((self.user.id, f'msg{idx}'))
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(ChatMessage.objects.filter(user=self.user).count(), 3)
+
+
+class AssemblyAIWebhookTests(TestCase):
+    def setUp(self):
+        self.url = reverse('assemblyai_webhook')
+
+    def post(self, body, secret='sekrit'):
+        headers = {'HTTP_' + WEBHOOK_AUTH_HEADER.upper().replace('-', '_'): secret} if secret else {}
+        return self.client.post(self.url, data=body, content_type='application/json', **headers)
+
+    def test_rejects_all_calls_without_configured_secret(self):
+        with mock.patch('agora.views.ASSEMBLYAI_WEBHOOK_SECRET', None):
+            response = self.post(b'{"transcript_id": "t1"}', secret=None)
+        self.assertEqual(response.status_code, 403)
+
+    @mock.patch('agora.views.ASSEMBLYAI_WEBHOOK_SECRET', 'sekrit')
+    def test_rejects_wrong_secret(self):
+        response = self.post(b'{"transcript_id": "t1"}', secret='wrong')
+        self.assertEqual(response.status_code, 401)
+
+    @mock.patch('agora.views.ASSEMBLYAI_WEBHOOK_SECRET', 'sekrit')
+    def test_rejects_non_object_payloads(self):
+        for body in (b'[1]', b'"t1"', b'null', b'{}', b'not json'):
+            self.assertEqual(self.post(body).status_code, 400, body)
+
+    @mock.patch('agora.views.ASSEMBLYAI_WEBHOOK_SECRET', 'sekrit')
+    @mock.patch('agora.views.async_task')
+    def test_queues_finalize_for_signed_payload(self, async_task):
+        response = self.post(b'{"transcript_id": "t1", "status": "completed"}')
+        self.assertEqual(response.status_code, 200)
+        async_task.assert_called_once_with('agora.tasks.finalize_transcription', 't1')
+
+    def test_webhook_only_registered_with_secret(self):
+        with mock.patch('agora.tasks.SITE_URL', 'https://meet.example.com'):
+            with mock.patch('agora.tasks.ASSEMBLYAI_WEBHOOK_SECRET', None):
+                self.assertIsNone(_assemblyai_webhook_url())
+            with mock.patch('agora.tasks.ASSEMBLYAI_WEBHOOK_SECRET', 'sekrit'):
+                self.assertEqual(_assemblyai_webhook_url(), 'https://meet.example.com' + self.url)
@@ -2,34 +2,33 @@ from django.urls import path
 from . import views
 from django.contrib.auth.views import LoginView, LogoutView
 
+# Django resolves routes with a linear scan, so the high-traffic endpoints are listed first.
 urlpatterns = [
-    # Authentication
-    path('register/', views.register, name='register'),
-    path('login/', LoginView.as_view(template_name='agora/login.html'), name='login'),
-    path('logout/', LogoutView.as_view(next_page='login'), name='logout'),
-    
+    # Meeting
+    path('meeting/<str:room_code>/', views.meeting, name='meeting'),
+
+    # API Endpoints
+    path('token/', views.generate_agora_token, name='agora-token'),
+    path('pusher/auth/', views.pusher_auth, name='agora-pusher-auth'),
+    path('chat/messages/', views.chat_messages, name='chat_messages'),
+
     # Home & Room Management
     path('', views.home, name='home'),
     path('create/', views.create_room, name='create_room'),
     path('join/', views.join_room, name='join_room'),
-    
-    # Meeting
-    path('meeting/<str:room_code>/', views.meeting, name='meeting'),
+
+    # Meeting actions
     path('meeting/<str:room_code>/end/', views.end_meeting, name='end_meeting'),
     path('meeting/<str:room_code>/upload-recording/', views.upload_recording, name='upload_recording'),
+    path('meeting/<str:room_code>/recording-status/', views.recording_status, name='recording_status'),
     path('meeting/<str:room_code>/upload-document/', views.upload_document, name='upload_document'),
     path('meeting/<str:room_code>/documents/', views.documents_page, name='documents_page'),
-    
+
     # Cloud Recording Endpoints
     path('meeting/<str:room_code>/start-recording/', views.start_recording, name='start_recording'),
     path('meeting/<str:room_code>/stop-recording/', views.stop_recording, name='stop_recording'),
     path('meeting/<str:room_code>/query-recording/', views.query_recording, name='query_recording'),
-    
-    # API Endpoints
-    path('pusher/auth/', views.pusher_auth, name='agora-pusher-auth'),
-    path('token/', views.generate_agora_token, name='agora-token'),
-    path('chat/messages/', views.chat_messages, name='chat_messages'),
-    
+
     # RAG Endpoints
     path('api/meetings/<int:meeting_id>/prepare-rag/', views.prepare_meeting_for_rag, name='prepare_rag'),
     path('api/meetings/<int:meeting_id>/query/', views.query_meeting_transcript, name='query_transcript'),
@@ -39,4 +38,11 @@ urlpatterns = [
     path('api/meetings/<int:meeting_id>/agenda/', views.meeting_agenda, name='meeting_agenda'),
     path('api/meetings/<int:meeting_id>/agenda/<int:point_id>/', views.delete_agenda_point, name='delete_agenda_point'),
     path('api/health/google/', views.google_llm_health, name='google_llm_health'),
+    path('api/health/google/all/', views.google_llm_health_all, name='google_llm_health_all'),
+    path('webhooks/assemblyai/', views.assemblyai_webhook, name='assemblyai_webhook'),
+
+    # Authentication
+    path('register/', views.register, name='register'),
+    path('login/', LoginView.as_view(template_name='agora/login.html'), name='login'),
+    path('logout/', LogoutView.as_view(next_page='login'), name='logout'),
 ]
@@ -1,35 +1,87 @@
 import os
+import re
 import time
-import json
-import random
 import string
+import uuid
+import hmac
+import secrets
 import logging
-import requests
+import orjson
+from functools import lru_cache
+from urllib.parse import parse_qsl
 
 from django.http.response import JsonResponse
-from django.http import StreamingHttpResponse, HttpResponseNotAllowed
+from django.http import Http404, HttpResponse, StreamingHttpResponse, HttpResponseNotAllowed
 from django.contrib.auth import get_user_model, authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from django.views.decorators.http import require_POST, require_http_methods
+from django.views.decorators.http import condition, require_POST, require_http_methods
+from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.forms import UserCreationForm
-from django.db.models import Q
-from django.db import models
-from django.core.files.base import ContentFile
+from django.db.models import Max, Prefetch, Q
+from django.db import IntegrityError, transaction
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
 
 from .agora_key.RtcTokenBuilder import RtcTokenBuilder, Role_Attendee
-from .models import MeetingRoom, ChatMessage, DocumentUpload, DocumentChunk, MeetingAgendaPoint
-from .recording_utils import AgoraCloudRecording, S3Manager
-from .assemblyai_utils import AssemblyAIClient
-from .rag_utils import generate_rag_response, process_transcript_for_rag, stream_rag_response_async
+from .models import MeetingRoom, ChatMessage, DocumentUpload, MeetingRagState, MeetingAgendaPoint, ConversationHistory
+from .recording_utils import get_cloud_recording, get_s3_manager, recording_bot_uid
+from .assemblyai_utils import WEBHOOK_AUTH_HEADER
+from .rag_utils import (
+    GOOGLE_HEALTH_CACHE_KEY, GOOGLE_HEALTH_DEADLINE, GOOGLE_HEALTH_FAILURE_TTL, GOOGLE_HEALTH_MODELS,
+    generate_rag_response_async, google_health_cache_key, probe_all, probe_google_async,
+    process_transcript_for_rag, stream_rag_response_async
+)
 from .agenda_utils import generate_agenda_points
+from .chat_buffer import chat_write_buffer
 from asgiref.sync import sync_to_async
 from django_q.tasks import async_task
 from pusher import Pusher
 
 logger = logging.getLogger(__name__)
 
+# Ending a room deletes its cache entry, but a per-process LocMem cache can't see another
+# worker's delete, so unshared caches only hold a room briefly
+_SHARED_CACHE = not settings.CACHES['default']['BACKEND'].endswith('LocMemCache')
+ROOM_CACHE_TTL = 60 if _SHARED_CACHE else 5  # seconds
+
+_ROOM_CODE_ALPHABET = (string.ascii_lowercase + string.digits).encode()
+ROOM_CODE_ATTEMPTS = 3
+# New codes are 3-1-3; older rooms still use the 3-3-3 shape
+_ROOM_CODE_RE = re.compile(r'^[a-z0-9]{3}-[a-z0-9]{1,3}-[a-z0-9]{3}$')
+
+# Credentials are read from settings once at import instead of on every request
+AGORA_APP_ID = settings.AGORA_APP_ID
+AGORA_APP_CERTIFICATE = settings.AGORA_APP_CERTIFICATE
+AWS_ACCESS_KEY_ID = settings.AWS_ACCESS_KEY_ID
+AWS_SECRET_ACCESS_KEY = settings.AWS_SECRET_ACCESS_KEY
+AWS_STORAGE_BUCKET_NAME = settings.AWS_STORAGE_BUCKET_NAME
+AWS_S3_REGION_NAME = settings.AWS_S3_REGION_NAME
+AGORA_CUSTOMER_ID = settings.AGORA_CUSTOMER_ID
+ASSEMBLYAI_WEBHOOK_SECRET = settings.ASSEMBLYAI_WEBHOOK_SECRET
+GOOGLE_API_KEY = settings.GOOGLE_API_KEY
+GOOGLE_GENERATE_MODEL = settings.GOOGLE_GENERATE_MODEL
+
+GOOGLE_HEALTH_CACHE_TTL = 15  # seconds
+
+
+def _recording_config_error():
+    """Return why cloud recording can't run with the current settings, or None if it can"""
+    if not AGORA_CUSTOMER_ID or AGORA_CUSTOMER_ID == 'your_customer_id_here':
+        return 'Agora Cloud Recording not configured. Please add AGORA_CUSTOMER_ID and AGORA_CUSTOMER_SECRET to .env file. See CLOUD_RECORDING_SETUP.md for details.'
+    if not AWS_ACCESS_KEY_ID or AWS_ACCESS_KEY_ID == 'your_aws_access_key_here':
+        return 'AWS S3 not configured. Please add AWS credentials to .env file. See CLOUD_RECORDING_SETUP.md for details.'
+    return None
+
+
+RECORDING_CONFIG_ERROR = _recording_config_error()
+
+_MP4_EXT = ('.mp4',)
+
+TOKEN_BUCKET_SECONDS = 1800
+
 # Lazy-load Pusher client to avoid crashes when env vars aren't set (e.g., in CI)
 _pusher_client = None
 
@@ -54,10 +106,70 @@ def get_pusher_client():
 
 
 def generate_room_code():
-    """Generate a unique 8-character room code like abc-d-ghi"""
-    chars = string.ascii_lowercase + string.digits
-    code = '-'.join([''.join(random.choices(chars, k=3)), random.choice(chars), ''.join(random.choices(chars, k=3))])
-    return code
+    """Generate an 8-character room code like abc-d-ghi"""
+    raw = bytes(_ROOM_CODE_ALPHABET[b % len(_ROOM_CODE_ALPHABET)] for b in secrets.token_bytes(7)).decode()
+    return f"{raw[:3]}-{raw[3]}-{raw[4:]}"
+
+
+def get_room(room_code, fields=None, related=None, **filters):
+    """Fetch a MeetingRoom by code (404 if missing), loading only ``fields`` when given
+    and joining the ``related`` one-to-one state rows (see MeetingRoomManager.with_meeting_state)"""
+    qs = MeetingRoom.objects.with_meeting_state(*related) if related else MeetingRoom.objects.all()
+    if fields:
+        qs = qs.only(*fields)
+    return get_object_or_404(qs, room_code=room_code, **filters)
+
+
+def orjson_response(data, status=200):
+    """JsonResponse equivalent that serializes with orjson (datetimes are encoded natively)"""
+    return HttpResponse(
+        orjson.dumps(data, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY),
+        content_type='application/json',
+        status=status
+    )
+
+
+def read_text_field(body, field):
+    """Decode a JSON object body and return its stripped string ``field``.
+
+    Returns '' when the field is missing or empty; raises ValueError when the body
+    is not a JSON object or the field is not a string.
+    """
+    payload = orjson.loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError('Request body must be a JSON object')
+    value = payload.get(field, '')
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    return value.strip()
+
+
+def recent_chat_messages(limit=50):
+    """The newest ``limit`` chat messages, returned oldest-first by the database"""
+    recent_ids = ChatMessage.objects.order_by('-created_at').values('id')[:limit]
+    return ChatMessage.objects.filter(id__in=recent_ids).order_by('created_at')
+
+
+def _room_cache_key(room_code):
+    return f'room:{room_code}'
+
+
+@lru_cache(maxsize=4096)
+def _build_token(channel_name, account, expire_bucket):
+    """Build an Agora RTC token that expires at the end of the bucket after ``expire_bucket``"""
+    privilege_expired_ts = (expire_bucket + 2) * TOKEN_BUCKET_SECONDS
+    token = RtcTokenBuilder.buildTokenWithAccount(
+        AGORA_APP_ID, AGORA_APP_CERTIFICATE, channel_name, account,
+        Role_Attendee, privilege_expired_ts
+    )
+    return token, privilege_expired_ts
+
+
+def get_rtc_token(channel_name, account):
+    """Return an Agora RTC token for channel/account; tokens are reused within a 30-minute bucket
+    and always have between 30 and 60 minutes of validity left"""
+    token, _ = _build_token(channel_name, account, int(time.time()) // TOKEN_BUCKET_SECONDS)
+    return token
 
 
 # User Registration
@@ -83,17 +195,20 @@ def register(request):
 # Home Page - List Meeting Rooms
 @login_required(login_url='/register/')
 def home(request):
-    # Get all active rooms
-    all_rooms = MeetingRoom.objects.filter(is_active=True)
-    user_rooms = request.user.hosted_meetings.filter(is_active=True)
+    # Get all active rooms (only the columns the dashboard renders)
+    room_fields = ('id', 'room_code', 'title', 'description', 'host', 'host__username')
+    all_rooms = MeetingRoom.objects.filter(is_active=True).select_related('host').only(*room_fields)
+    user_rooms = request.user.hosted_meetings.filter(is_active=True).select_related('host').only(*room_fields)
 
     # Recent chat messages for dashboard
-    chat_messages = ChatMessage.objects.select_related('user').order_by('-created_at')[:50]
+    chat_messages = recent_chat_messages().select_related('user').only(
+        'id', 'content', 'created_at', 'user__username'
+    )
     
     return render(request, 'agora/home.html', {
         'all_rooms': all_rooms,
         'user_rooms': user_rooms,
-        'chat_messages': list(reversed(chat_messages))
+        'chat_messages': chat_messages
     })
 
 
@@ -104,15 +219,21 @@ def create_room(request):
         title = request.POST.get('title', 'Untitled Meeting')
         description = request.POST.get('description', '')
         
-        # Generate unique room code
-        room_code = generate_room_code()
-        
-        room = MeetingRoom.objects.create(
-            host=request.user,
-            title=title,
-            description=description,
-            room_code=room_code
-        )
+        # room_code is unique, so a (very unlikely) collision surfaces as IntegrityError and we retry
+        for attempt in range(ROOM_CODE_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    room = MeetingRoom.objects.create(
+                        host=request.user,
+                        title=title,
+                        description=description,
+                        room_code=generate_room_code()
+                    )
+                break
+            except IntegrityError:
+                if attempt == ROOM_CODE_ATTEMPTS - 1:
+                    raise
+        cache.delete(_room_cache_key(room.room_code))
         
         return redirect('meeting', room_code=room.room_code)
     
@@ -125,11 +246,14 @@ def join_room(request):
     if request.method == 'POST':
         room_code = request.POST.get('room_code', '').strip()
         
-        try:
-            room = MeetingRoom.objects.get(room_code=room_code, is_active=True)
-            return redirect('meeting', room_code=room.room_code)
-        except MeetingRoom.DoesNotExist:
+        # Reject malformed codes without touching the database
+        if not _ROOM_CODE_RE.match(room_code):
+            return render(request, 'agora/join_room.html', {'error': 'Invalid code format'})
+
+        room = MeetingRoom.objects.filter(room_code=room_code, is_active=True).only('room_code').first()
+        if room is None:
             return render(request, 'agora/join_room.html', {'error': 'Room not found or inactive'})
+        return redirect('meeting', room_code=room.room_code)
     
     return render(request, 'agora/join_room.html')
 
@@ -137,13 +261,17 @@ def join_room(request):
 # Meeting Room Interface
 @login_required(login_url='/register/')
 def meeting(request, room_code):
-    room = get_object_or_404(MeetingRoom, room_code=room_code, is_active=True)
+    room = cache.get_or_set(
+        _room_cache_key(room_code),
+        lambda: get_room(room_code, ['id', 'room_id', 'room_code', 'title', 'host', 'is_active'], is_active=True),
+        ROOM_CACHE_TTL
+    )
     
     return render(request, 'agora/meeting.html', {
         'room': room,
         'room_code': room_code,
-        'room_id': str(room.room_id),
-        'is_host': room.host == request.user,
+        'room_id': room.channel_name,
+        'is_host': room.host_id == request.user.id,
         'meeting_db_id': room.id
     })
 
@@ -152,55 +280,65 @@ def meeting(request, room_code):
 @login_required(login_url='/register/')
 @require_POST
 def end_meeting(request, room_code):
-    room = get_object_or_404(MeetingRoom, room_code=room_code)
+    room = get_room(room_code, ['id', 'host', 'is_active'])
     
-    if room.host != request.user:
+    if room.host_id != request.user.id:
         return JsonResponse({'error': 'Only host can end meeting'}, status=403)
     
     room.is_active = False
-    room.save()
+    room.save(update_fields=['is_active'])
+    cache.delete(_room_cache_key(room_code))
     
     return JsonResponse({'message': 'Meeting ended'})
 
 
+@lru_cache(maxsize=1024)
+def _pusher_authenticate(channel, socket_id, user_id, username):
+    # The presence-channel signature is deterministic for these inputs, so retries reuse it
+    return get_pusher_client().authenticate(
+        channel=channel,
+        socket_id=socket_id,
+        custom_data={
+            'user_id': user_id,
+            'user_info': {
+                'id': user_id,
+                'name': username
+            }
+        })
+
+
 # Pusher Authentication
+@require_POST
 def pusher_auth(request):
     client = get_pusher_client()
     if not client:
         return JsonResponse({'error': 'Pusher not configured'}, status=503)
     
-    payload = client.authenticate(
-        channel=request.POST['channel_name'],
-        socket_id=request.POST['socket_id'],
-        custom_data={
-            'user_id': request.user.id,
-            'user_info': {
-                'id': request.user.id,
-                'name': request.user.username
-            }
-        })
-    return JsonResponse(payload)
+    # Pusher posts two small form fields; read them straight from the body
+    try:
+        params = dict(parse_qsl(request.body.decode('ascii')))
+        channel = params['channel_name']
+        socket_id = params['socket_id']
+    except (UnicodeDecodeError, KeyError):
+        return JsonResponse({'error': 'channel_name and socket_id are required'}, status=400)
+    
+    payload = _pusher_authenticate(channel, socket_id, request.user.id, request.user.username)
+    return orjson_response(payload)
 
 
 # Generate Agora Token for Room
 def generate_agora_token(request):
-    appID = settings.AGORA_APP_ID
-    appCertificate = settings.AGORA_APP_CERTIFICATE
+    appID = AGORA_APP_ID
     
-    data = json.loads(request.body.decode('utf-8'))
+    data = orjson.loads(request.body)
     channelName = data['channelName']
     
     # For Agora SDK v4, use numeric UID
     uid = request.user.id
     
-    expireTimeInSeconds = 3600
-    currentTimestamp = int(time.time())
-    privilegeExpiredTs = currentTimestamp + expireTimeInSeconds
-
-    token = RtcTokenBuilder.buildTokenWithAccount(
-        appID, appCertificate, channelName, str(uid), Role_Attendee, privilegeExpiredTs)
+    token = get_rtc_token(channelName, str(uid))
 
-    return JsonResponse({'token': token, 'appID': appID, 'uid': uid})
+    return orjson_response({'token': token, 'appID': appID, 'uid': uid})
 
 
 # Start Cloud Recording (Host Only)
@@ -209,21 +347,14 @@ def generate_agora_token(request):
 def start_recording(request, room_code):
     """Start Agora Cloud Recording for the meeting"""
     try:
-        # Validate credentials are set
-        if not settings.AGORA_CUSTOMER_ID or settings.AGORA_CUSTOMER_ID == 'your_customer_id_here':
-            return JsonResponse({
-                'error': 'Agora Cloud Recording not configured. Please add AGORA_CUSTOMER_ID and AGORA_CUSTOMER_SECRET to .env file. See CLOUD_RECORDING_SETUP.md for details.'
-            }, status=500)
-        
-        if not settings.AWS_ACCESS_KEY_ID or settings.AWS_ACCESS_KEY_ID == 'your_aws_access_key_here':
-            return JsonResponse({
-                'error': 'AWS S3 not configured. Please add AWS credentials to .env file. See CLOUD_RECORDING_SETUP.md for details.'
-            }, status=500)
+        # Credentials are validated once at import
+        if RECORDING_CONFIG_ERROR:
+            return JsonResponse({'error': RECORDING_CONFIG_ERROR}, status=500)
         
-        room = get_object_or_404(MeetingRoom, room_code=room_code)
+        room = get_room(room_code, ['id', 'room_id', 'host'], related=('recording',))
         
         # Only host can start recording
-        if room.host != request.user:
+        if room.host_id != request.user.id:
             return JsonResponse({'error': 'Only the host can start recording'}, status=403)
         
         recording = room.get_recording()
@@ -232,26 +363,17 @@ def start_recording(request, room_code):
         if recording.recording_status == 'recording':
             return JsonResponse({'error': 'Recording already in progress'}, status=400)
         
-        # Generate unique UID for recording bot (use a large number to avoid conflicts)
-        recording_uid = 999000000 + room.id
+        # Recording bot UID lives in a reserved high-byte range so it can't clash with participants
+        recording_uid = recording_bot_uid(room.id)
         
         # Get channel name (same as room_id)
-        channel_name = str(room.room_id)
+        channel_name = room.channel_name
         
-        # Generate token for recording bot
-        appID = settings.AGORA_APP_ID
-        appCertificate = settings.AGORA_APP_CERTIFICATE
-        expireTimeInSeconds = 3600
-        currentTimestamp = int(time.time())
-        privilegeExpiredTs = currentTimestamp + expireTimeInSeconds
-        
-        recording_token = RtcTokenBuilder.buildTokenWithAccount(
-            appID, appCertificate, channel_name, str(recording_uid), 
-            Role_Attendee, privilegeExpiredTs
-        )
+        # Generate token for recording bot (the UID is deterministic per room, so it caches well)
+        recording_token = get_rtc_token(channel_name, str(recording_uid))
         
         # Initialize cloud recording
-        cloud_recording = AgoraCloudRecording()
+        cloud_recording = get_cloud_recording()
         
         # Step 1: Acquire resource
         acquire_result = cloud_recording.acquire_resource(channel_name, recording_uid)
@@ -270,10 +392,10 @@ def start_recording(request, room_code):
             uid=recording_uid,
             resource_id=resource_id,
             token=recording_token,
-            bucket_name=settings.AWS_STORAGE_BUCKET_NAME,
-            bucket_access_key=settings.AWS_ACCESS_KEY_ID,
-            bucket_secret_key=settings.AWS_SECRET_ACCESS_KEY,
-            bucket_region=settings.AWS_S3_REGION_NAME
+            bucket_name=AWS_STORAGE_BUCKET_NAME,
+            bucket_access_key=AWS_ACCESS_KEY_ID,
+            bucket_secret_key=AWS_SECRET_ACCESS_KEY,
+            bucket_region=AWS_S3_REGION_NAME
         )
         
         if not start_result['success']:
@@ -289,7 +411,9 @@ def start_recording(request, room_code):
         recording.recording_sid = start_result['sid']
         recording.recording_resource_id = resource_id
         recording.recording_uid = recording_uid
-        recording.save()
+        recording.save(update_fields=[
+            'recording_enabled', 'recording_status', 'recording_sid', 'recording_resource_id', 'recording_uid'
+        ])
         
         return JsonResponse({
             'message': 'Recording started successfully',
@@ -307,10 +431,10 @@ def start_recording(request, room_code):
 def stop_recording(request, room_code):
     """Stop Agora Cloud Recording and update S3 URL"""
     try:
-        room = get_object_or_404(MeetingRoom, room_code=room_code)
+        room = get_room(room_code, ['id', 'room_id', 'host'], related=('recording',))
         
         # Only host can stop recording
-        if room.host != request.user:
+        if room.host_id != request.user.id:
             return JsonResponse({'error': 'Only the host can stop recording'}, status=403)
         
         recording = room.get_recording()
@@ -323,11 +447,11 @@ def stop_recording(request, room_code):
             return JsonResponse({'error': 'Missing recording session data'}, status=400)
         
         # Initialize cloud recording
-        cloud_recording = AgoraCloudRecording()
+        cloud_recording = get_cloud_recording()
         
         # Stop recording
         stop_result = cloud_recording.stop_recording(
-            channel_name=str(room.room_id),
+            channel_name=room.channel_name,
             uid=recording.recording_uid,
             resource_id=recording.recording_resource_id,
             sid=recording.recording_sid
@@ -348,24 +472,19 @@ def stop_recording(request, room_code):
         
         # Generate S3 URL if files are available
         if file_list:
-            # Get the first MP4 file (or HLS if no MP4)
-            recording_file = None
-            for file_info in file_list:
-                filename = file_info.get('fileName', '')
-                if filename.endswith('.mp4'):
-                    recording_file = filename
-                    break
-            
-            if not recording_file and file_list:
-                recording_file = file_list[0].get('fileName')
+            # Get the first MP4 file (or the first file, e.g. HLS, if no MP4)
+            recording_file = next(
+                (f['fileName'] for f in file_list if f.get('fileName', '').endswith(_MP4_EXT)),
+                None
+            ) or file_list[0].get('fileName')
             
             if recording_file:
                 # Construct S3 URL
-                s3_manager = S3Manager()
+                s3_manager = get_s3_manager()
                 s3_key = f"recordings/{recording_file}"
                 recording.s3_recording_url = s3_manager.get_s3_url(s3_key)
         
-            recording.save()
+            recording.save(update_fields=['recording_status', 's3_recording_url'])
         
         return JsonResponse({
             'message': 'Recording stopped successfully',
@@ -382,14 +501,14 @@ def stop_recording(request, room_code):
 def query_recording(request, room_code):
     """Query the current status of cloud recording"""
     try:
-        room = get_object_or_404(MeetingRoom, room_code=room_code)
+        room = get_room(room_code, ['id'], related=('recording',))
         
         recording = room.get_recording()
 
         if not recording.recording_resource_id or not recording.recording_sid:
             return JsonResponse({'error': 'No recording session found'}, status=400)
         
-        cloud_recording = AgoraCloudRecording()
+        cloud_recording = get_cloud_recording()
         
         query_result = cloud_recording.query_recording(
             resource_id=recording.recording_resource_id,
@@ -417,10 +536,10 @@ def query_recording(request, room_code):
 def upload_recording(request, room_code):
     """Upload locally recorded audio to project directory"""
     try:
-        room = get_object_or_404(MeetingRoom, room_code=room_code)
+        room = get_room(room_code, ['id', 'host'], related=('recording', 'transcript'))
         
         # Only host can upload recordings
-        if room.host != request.user:
+        if room.host_id != request.user.id:
             return JsonResponse({'error': 'Only the host can upload recordings'}, status=403)
         
         if 'recording' not in request.FILES:
@@ -434,9 +553,9 @@ def upload_recording(request, room_code):
         filename = f"{room_code}_{timestamp}.webm"
         
         # Save the audio recording
-        from django.core.files.storage import default_storage
         file_path = f"recordings/{filename}"
-        saved_path = default_storage.save(file_path, ContentFile(recording_file.read()))
+        # Storage copies UploadedFile objects chunk by chunk, so the recording is never fully buffered in memory
+        saved_path = default_storage.save(file_path, recording_file)
         
         # Get full file path
         full_path = default_storage.path(saved_path)
@@ -444,85 +563,84 @@ def upload_recording(request, room_code):
         recording = room.get_recording()
         transcript = room.get_transcript()
 
-        # Try to upload to S3 if configured
-        s3_url = None
-        s3_error = None
-        presigned_url = None
-        if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY and settings.AWS_STORAGE_BUCKET_NAME:
-            try:
-                s3_manager = S3Manager()
-                s3_key = f"recordings/{filename}"
-                uploaded = s3_manager.upload_file(full_path, s3_key)
-                if uploaded:
-                    s3_url = s3_manager.get_s3_url(s3_key)
-                    presigned_url = s3_manager.generate_presigned_url(s3_key)
-                    recording.s3_recording_url = s3_url
-                else:
-                    s3_error = "S3 upload failed"
-            except Exception as upload_error:
-                s3_error = str(upload_error)
-
-        # Transcribe with AssemblyAI (use presigned URL for private buckets)
-        transcript_text = None
-        transcript_status = 'not_started'
-        transcript_id = None
-        transcript_error = None
-        if settings.ASSEMBLYAI_API_KEY and (presigned_url or s3_url):
-            try:
-                assembly_client = AssemblyAIClient()
-                audio_url = presigned_url or s3_url
-                start_data = assembly_client.start_transcription(audio_url)
-                transcript_id = start_data.get('id')
-                transcript_status = start_data.get('status', 'processing')
-
-                if transcript_id:
-                    result = assembly_client.wait_for_transcription(transcript_id, timeout_seconds=60, poll_interval=3)
-                    transcript_status = result.get('status', transcript_status)
-                    if transcript_status == 'completed':
-                        transcript_text = result.get('text')
-                    elif transcript_status == 'failed':
-                        transcript_error = result.get('error')
-            except Exception as transcribe_error:
-                transcript_status = 'failed'
-                transcript_error = str(transcribe_error)
-
-        # Update recording and transcript info
+        # Update recording info; S3 upload and transcription run in the background
         recording.recording_enabled = True
         recording.recording_duration = int(float(duration))
         recording.recording_status = 'completed'
-        recording.save()
+        recording.save(update_fields=['recording_enabled', 'recording_duration', 'recording_status'])
 
-        transcript.transcript_text = transcript_text
-        transcript.transcript_status = transcript_status
-        transcript.transcript_id = transcript_id
-        transcript.save()
+        transcript.transcript_status = 'processing'
+        transcript.save(update_fields=['transcript_status'])
 
-        rag_enqueued = False
-        if transcript_status == 'completed' and transcript_text:
-            async_task('agora.rag_utils.process_transcript_for_rag', room.id)
-            rag_enqueued = True
+        task_id = async_task('agora.tasks.process_recording_upload', room.id, saved_path)
 
         response_data = {
             'message': 'Audio recording saved successfully',
+            'status': 'queued',
+            'task_id': task_id,
             'filename': filename,
             'duration': duration,
             'file_path': saved_path,
             'full_path': full_path,
             'size_bytes': recording_file.size,
-            's3_url': s3_url,
-            's3_error': s3_error,
-            'transcript_status': transcript_status,
-            'transcript_id': transcript_id,
-            'transcript_error': transcript_error,
-            'rag_enqueued': rag_enqueued
+            'transcript_status': transcript.transcript_status
         }
-        return JsonResponse(response_data)
+        # 202: the file is stored locally, S3 upload and transcription are still pending
+        return JsonResponse(response_data, status=202)
+        
+    except Exception as e:
+        logger.exception("upload_recording failed for %s", room_code)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+# Recording Processing Status
+@login_required(login_url='/register/')
+@require_http_methods(["GET"])
+def recording_status(request, room_code):
+    """Report background upload/transcription progress for a meeting recording"""
+    try:
+        room = get_room(room_code, ['id'], related=('recording', 'transcript'))
+        
+        recording = room.get_recording()
+        transcript = room.get_transcript()
+        
+        return JsonResponse({
+            'recording_status': recording.recording_status,
+            's3_url': recording.s3_recording_url,
+            'transcript_status': transcript.transcript_status,
+            'transcript_id': transcript.transcript_id
+        })
         
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error uploading recording: {error_details}")
-        return JsonResponse({'error': str(e), 'details': error_details}, status=500)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+# AssemblyAI Transcript Webhook
+@csrf_exempt
+@require_POST
+def assemblyai_webhook(request):
+    """Receive AssemblyAI completion callbacks and finish the transcript in the background"""
+    secret = ASSEMBLYAI_WEBHOOK_SECRET
+    # Webhooks are only registered when a secret is configured, so unsigned calls are never legitimate
+    if not secret:
+        return JsonResponse({'error': 'Webhook not configured'}, status=403)
+    provided = request.headers.get(WEBHOOK_AUTH_HEADER, '')
+    if not hmac.compare_digest(provided.encode(), secret.encode()):
+        return JsonResponse({'error': 'Invalid webhook signature'}, status=401)
+    
+    try:
+        payload = orjson.loads(request.body)
+    except orjson.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    
+    transcript_id = payload.get('transcript_id')
+    if not transcript_id:
+        return JsonResponse({'error': 'transcript_id is required'}, status=400)
+    
+    async_task('agora.tasks.finalize_transcription', transcript_id)
+    return JsonResponse({'status': 'accepted'})
 
 
 # Upload External Document/Audio
@@ -531,9 +649,9 @@ def upload_recording(request, room_code):
 def upload_document(request, room_code):
     """Upload external data (pdf/txt/doc/docx/mp3) for RAG"""
     try:
-        room = get_object_or_404(MeetingRoom, room_code=room_code)
+        room = get_room(room_code, ['id', 'host'])
 
-        if room.host != request.user:
+        if room.host_id != request.user.id:
             return JsonResponse({'error': 'Only the host can upload documents'}, status=403)
 
         if 'document' not in request.FILES:
@@ -547,9 +665,8 @@ def upload_document(request, room_code):
         timestamp = int(time.time())
         safe_name = f"{room_code}_{timestamp}{ext}"
 
-        from django.core.files.storage import default_storage
         file_path = f"documents/{safe_name}"
-        saved_path = default_storage.save(file_path, ContentFile(uploaded_file.read()))
+        saved_path = default_storage.save(file_path, uploaded_file)
         full_path = default_storage.path(saved_path)
 
         document = DocumentUpload.objects.create(
@@ -587,12 +704,16 @@ def upload_document(request, room_code):
 def list_documents(request, meeting_id):
     """Return document upload statuses for a meeting."""
     try:
-        meeting = get_object_or_404(MeetingRoom, id=meeting_id)
+        meeting = get_object_or_404(MeetingRoom.objects.only('id', 'host'), id=meeting_id)
 
-        if meeting.host != request.user:
+        if meeting.host_id != request.user.id:
             return JsonResponse({'error': 'Only host can view documents'}, status=403)
 
-        documents = DocumentUpload.objects.filter(meeting=meeting).order_by('-created_at')
+        # Skip raw_text (full extracted document text) and stream rows instead of caching the queryset
+        documents = DocumentUpload.objects.filter(meeting=meeting).only(
+            'id', 'file_name', 'file_type', 'status', 's3_url', 'chunk_count',
+            'error_message', 'created_at', 'processed_at'
+        ).order_by('-created_at').iterator(chunk_size=100)
         data = [
             {
                 'id': doc.id,
@@ -616,8 +737,8 @@ def list_documents(request, meeting_id):
 
 @login_required
 def documents_page(request, room_code):
-    room = get_object_or_404(MeetingRoom, room_code=room_code, is_active=True)
-    if room.host != request.user:
+    room = get_room(room_code, ['id', 'room_code', 'title', 'host'], is_active=True)
+    if room.host_id != request.user.id:
         return redirect('meeting', room_code=room.room_code)
 
     return render(request, 'agora/documents.html', {
@@ -626,36 +747,55 @@ def documents_page(request, room_code):
     })
 
 
+def _chat_etag(request):
+    """ETag for the dashboard chat feed: the id of the newest message (one probe on the created_at index)
+
+    A message still queued in chat_write_buffer isn't counted until its flush, so a poll right
+    after a POST may get a 304; the sender already rendered the message from the POST response.
+    """
+    if request.method != 'GET':
+        return None
+    latest_id = ChatMessage.objects.order_by('-created_at').values_list('id', flat=True).first()
+    return f'chat-{latest_id or 0}'
+
+
 # Chat History (Dashboard)
 @login_required(login_url='/register/')
 @require_http_methods(["GET", "POST"])
+@condition(etag_func=_chat_etag)
 def chat_messages(request):
     if request.method == "GET":
-        messages = ChatMessage.objects.select_related('user').order_by('-created_at')[:50]
+        messages = recent_chat_messages().values('id', 'content', 'created_at', 'user__username')
         data = [
             {
-                'id': msg.id,
-                'user': msg.user.username,
-                'content': msg.content,
-                'created_at': msg.created_at.isoformat()
+                'id': msg['id'],
+                'user': msg['user__username'],
+                'content': msg['content'],
+                'created_at': msg['created_at']
             }
-            for msg in reversed(messages)
+            for msg in messages
         ]
-        return JsonResponse({'messages': data})
+        return orjson_response({'messages': data})
 
     # POST - create new message
     try:
-        payload = json.loads(request.body.decode('utf-8'))
-        content = payload.get('content', '').strip()
+        try:
+            content = read_text_field(request.body, 'content')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
         if not content:
             return JsonResponse({'error': 'Message content is required'}, status=400)
 
-        msg = ChatMessage.objects.create(user=request.user, content=content)
-        return JsonResponse({
-            'id': msg.id,
-            'user': msg.user.username,
-            'content': msg.content,
-            'created_at': msg.created_at.isoformat()
+        # Inserts are batched by a write-behind buffer (the row id isn't known yet) until its
+        # backlog reaches SYNC_WRITE_DEPTH; past that the message is saved inline
+        message = chat_write_buffer.submit(request.user.id, content)
+        return orjson_response({
+            'id': message.id if message else None,
+            'tempId': uuid.uuid4().hex,
+            'queued': message is None,
+            'user': request.user.username,
+            'content': content,
+            'created_at': message.created_at if message else timezone.now()
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -669,23 +809,27 @@ def prepare_meeting_for_rag(request, meeting_id):
     GET /api/meetings/{meeting_id}/prepare-rag/
     """
     try:
-        meeting = get_object_or_404(MeetingRoom, id=meeting_id)
+        # Only the host id and transcript status are needed; no model is instantiated
+        row = MeetingRoom.objects.filter(id=meeting_id).values(
+            'host_id', 'transcript__transcript_status'
+        ).first()
+        if row is None:
+            return JsonResponse({'error': 'Meeting not found'}, status=404)
         
         # Only allow host to trigger
-        if meeting.host != request.user:
+        if row['host_id'] != request.user.id:
             return JsonResponse({'error': 'Only host can prepare for RAG'}, status=403)
         
-        transcript = meeting.get_transcript()
-
         # Check if transcript is ready
-        if transcript.transcript_status != 'completed':
+        transcript_status = row['transcript__transcript_status'] or 'not_started'
+        if transcript_status != 'completed':
             return JsonResponse({
                 'error': 'Transcript not yet completed',
-                'status': transcript.transcript_status
+                'status': transcript_status
             }, status=400)
         
         # Process for RAG
-        result = process_transcript_for_rag(meeting.id)
+        result = process_transcript_for_rag(meeting_id)
         
         if result['success']:
             return JsonResponse({
@@ -703,6 +847,30 @@ def prepare_meeting_for_rag(request, meeting_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def serialize_chunks(relevant_chunks):
+    """Shape RAG search hits for the API; scores are left as-is for orjson to format"""
+    return [
+        {
+            'index': chunk['chunk_index'],
+            'text': chunk['text'],
+            'score': chunk['score'],
+            'start_time': chunk.get('start_time'),
+            'end_time': chunk.get('end_time'),
+            'source_type': chunk.get('source_type'),
+            'meeting_title': chunk.get('meeting_title'),
+            'document_id': chunk.get('document_id'),
+            'document_name': chunk.get('document_name')
+        }
+        for chunk in relevant_chunks
+    ]
+
+
+def _authenticated_user_id(request):
+    """Resolve request.user (session lookup) and return its id, or None for anonymous users"""
+    user = request.user
+    return user.id if user.is_authenticated else None
+
+
 async def query_meeting_transcript(request, meeting_id):
     """
     Query a meeting transcript using RAG with conversation context
@@ -712,29 +880,33 @@ async def query_meeting_transcript(request, meeting_id):
     try:
         if request.method != 'POST':
             return HttpResponseNotAllowed(['POST'])
-        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
-        if not is_authenticated:
+        user_id = await sync_to_async(_authenticated_user_id)(request)
+        if user_id is None:
             return JsonResponse({'error': 'Authentication required'}, status=401)
-        meeting = await sync_to_async(get_object_or_404)(MeetingRoom, id=meeting_id)
-        payload = json.loads(request.body.decode('utf-8'))
-        question = payload.get('question', '').strip()
+        # Single query for the meeting, its RAG state and the document-chunk flag
+        meeting = await sync_to_async(MeetingRoom.objects.with_rag_readiness)(meeting_id)
+        if meeting is None:
+            return JsonResponse({'error': 'Meeting not found'}, status=404)
+        try:
+            question = read_text_field(request.body, 'question')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
         
         if not question:
             return JsonResponse({'error': 'Question is required'}, status=400)
         
         # Check if meeting is prepared for RAG (transcript or documents)
-        has_doc_chunks = await sync_to_async(
-            DocumentChunk.objects.filter(document__meeting=meeting).exists
-        )()
-        rag_state = await sync_to_async(meeting.get_rag_state)()
-        if not rag_state.embeddings_created_at and not has_doc_chunks:
+        try:
+            embeddings_created_at = meeting.rag_state.embeddings_created_at
+        except MeetingRagState.DoesNotExist:
+            embeddings_created_at = None
+        if not embeddings_created_at and not meeting.has_doc_chunks:
             return JsonResponse({
                 'error': 'Meeting data not yet processed for RAG. Upload a document or prepare transcript.',
                 'status': 'not_prepared'
             }, status=400)
         
         stream = request.GET.get('stream') == 'true'
-        user_id = await sync_to_async(lambda: request.user.id)()
 
         if stream:
             stream_gen, _ = await stream_rag_response_async(
@@ -745,30 +917,17 @@ async def query_meeting_transcript(request, meeting_id):
             )
             return StreamingHttpResponse(stream_gen, content_type='text/plain; charset=utf-8')
 
-        response_text, relevant_chunks = await sync_to_async(generate_rag_response)(
+        response_text, relevant_chunks = await generate_rag_response_async(
             meeting_id=meeting.id,
             user_id=user_id,
             query=question,
             top_k=5
         )
         
-        return JsonResponse({
+        return orjson_response({
             'success': True,
             'response': response_text,
-            'relevant_chunks': [
-                {
-                    'index': chunk['chunk_index'],
-                    'text': chunk['text'],
-                    'score': round(chunk['score'], 3),
-                    'start_time': chunk.get('start_time'),
-                    'end_time': chunk.get('end_time'),
-                    'source_type': chunk.get('source_type'),
-                    'meeting_title': chunk.get('meeting_title'),
-                    'document_id': chunk.get('document_id'),
-                    'document_name': chunk.get('document_name')
-                }
-                for chunk in relevant_chunks
-            ]
+            'relevant_chunks': serialize_chunks(relevant_chunks)
         })
     
     except Exception as e:
@@ -780,17 +939,18 @@ async def query_global_rag(request):
     try:
         if request.method != 'POST':
             return HttpResponseNotAllowed(['POST'])
-        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
-        if not is_authenticated:
+        user_id = await sync_to_async(_authenticated_user_id)(request)
+        if user_id is None:
             return JsonResponse({'error': 'Authentication required'}, status=401)
-        payload = json.loads(request.body.decode('utf-8'))
-        question = payload.get('question', '').strip()
+        try:
+            question = read_text_field(request.body, 'question')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
         if not question:
             return JsonResponse({'error': 'Question is required'}, status=400)
 
         stream = request.GET.get('stream') == 'true'
-        user_id = await sync_to_async(lambda: request.user.id)()
 
         if stream:
             stream_gen, _ = await stream_rag_response_async(
@@ -801,118 +961,84 @@ async def query_global_rag(request):
             )
             return StreamingHttpResponse(stream_gen, content_type='text/plain; charset=utf-8')
 
-        response_text, relevant_chunks = await sync_to_async(generate_rag_response)(
+        response_text, relevant_chunks = await generate_rag_response_async(
             meeting_id=None,
             user_id=user_id,
             query=question,
             top_k=5
         )
 
-        return JsonResponse({
+        return orjson_response({
             'success': True,
             'response': response_text,
-            'relevant_chunks': [
-                {
-                    'index': chunk['chunk_index'],
-                    'text': chunk['text'],
-                    'score': round(chunk['score'], 3),
-                    'start_time': chunk.get('start_time'),
-                    'end_time': chunk.get('end_time'),
-                    'source_type': chunk.get('source_type'),
-                    'meeting_title': chunk.get('meeting_title'),
-                    'document_id': chunk.get('document_id'),
-                    'document_name': chunk.get('document_name')
-                }
-                for chunk in relevant_chunks
-            ]
+            'relevant_chunks': serialize_chunks(relevant_chunks)
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-@login_required(login_url='/register/')
-@require_http_methods(["GET"])
-def google_llm_health(request):
+async def google_llm_health(request):
     """
     Health-check for Google LLM configuration.
     GET /api/health/google/
     """
-    if not settings.GOOGLE_API_KEY:
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user_id = await sync_to_async(_authenticated_user_id)(request)
+    if user_id is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    if not GOOGLE_API_KEY:
         return JsonResponse({'ok': False, 'error': 'GOOGLE_API_KEY is not configured'}, status=503)
 
-    model_name = settings.GOOGLE_GENERATE_MODEL
-    url = (
-        "https://generativelanguage.googleapis.com/v1beta/models/"
-        f"{model_name}:generateContent?key={settings.GOOGLE_API_KEY}"
+    # Bursts of probes share one upstream call; the scheduled probe task also fills this key
+    cached = await cache.aget(GOOGLE_HEALTH_CACHE_KEY)
+    if cached is not None:
+        data, status = cached
+        return JsonResponse(data, status=status)
+
+    # The probe is pure network wait; run it off the request thread under a hard deadline
+    data, status = await probe_google_async(GOOGLE_GENERATE_MODEL, GOOGLE_HEALTH_DEADLINE)
+    # Failures are only held briefly so a recovery shows up quickly
+    await cache.aset(
+        GOOGLE_HEALTH_CACHE_KEY, (data, status),
+        GOOGLE_HEALTH_CACHE_TTL if data['ok'] else GOOGLE_HEALTH_FAILURE_TTL
     )
-    payload = {
-        "contents": [
-            {
-                "role": "user",
-                "parts": [{"text": "Reply with OK"}]
-            }
-        ],
-        "generationConfig": {
-            "maxOutputTokens": 8,
-            "temperature": 0.0
-        }
-    }
+    return JsonResponse(data, status=status)
 
-    started = time.time()
-    try:
-        response = requests.post(
-            url,
-            json=payload,
-            timeout=(settings.GOOGLE_CONNECT_TIMEOUT, settings.GOOGLE_READ_TIMEOUT)
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        text_parts = []
-        for candidate in data.get("candidates", []):
-            for part in candidate.get("content", {}).get("parts", []):
-                part_text = part.get("text")
-                if part_text:
-                    text_parts.append(part_text)
-
-        output = "".join(text_parts).strip()
-        latency_ms = int((time.time() - started) * 1000)
-        return JsonResponse({
-            'ok': True,
-            'model': model_name,
-            'latency_ms': latency_ms,
-            'output': output
-        })
-    except requests.exceptions.ReadTimeout as e:
-        logger.error("Google health-check timed out: %s", str(e))
-        return JsonResponse({
-            'ok': False,
-            'model': model_name,
-            'error': 'Google request timed out'
-        }, status=503)
-    except requests.exceptions.RequestException as e:
-        status = getattr(e.response, "status_code", None)
-        body = getattr(e.response, "text", "")
-        logger.error("Google health-check failed (status=%s): %s", status, body[:1000])
-        return JsonResponse({
-            'ok': False,
-            'model': model_name,
-            'error': 'Google request failed'
-        }, status=503)
-    except ValueError as e:
-        logger.error("Google health-check invalid JSON response: %s", str(e))
-        return JsonResponse({
-            'ok': False,
-            'model': model_name,
-            'error': 'Invalid JSON response from Google'
-        }, status=503)
-    except Exception as e:
-        logger.error("Google health-check unexpected error: %s", str(e))
-        return JsonResponse({
-            'ok': False,
-            'model': model_name,
-            'error': str(e)
-        }, status=503)
+
+async def google_llm_health_all(request):
+    """
+    Health-check every configured Google model in parallel.
+    GET /api/health/google/all/
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user_id = await sync_to_async(_authenticated_user_id)(request)
+    if user_id is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    if not GOOGLE_API_KEY:
+        return JsonResponse({'ok': False, 'error': 'GOOGLE_API_KEY is not configured'}, status=503)
+
+    # Reuse per-model results cached by the single-model endpoint; only probe the misses
+    keys = [google_health_cache_key(model_name) for model_name in GOOGLE_HEALTH_MODELS]
+    cached = await cache.aget_many(keys)
+    missing = [
+        (key, model_name)
+        for key, model_name in zip(keys, GOOGLE_HEALTH_MODELS)
+        if key not in cached
+    ]
+    if missing:
+        probed = await probe_all([model_name for _, model_name in missing], GOOGLE_HEALTH_DEADLINE)
+        for (key, _), (data, status) in zip(missing, probed):
+            cached[key] = (data, status)
+            await cache.aset(
+                key, (data, status),
+                GOOGLE_HEALTH_CACHE_TTL if data['ok'] else GOOGLE_HEALTH_FAILURE_TTL
+            )
+
+    results = [cached[key][0] for key in keys]
+    all_ok = all(item['ok'] for item in results)
+    return JsonResponse({'ok': all_ok, 'models': results}, status=200 if all_ok else 503)
 
 
 @login_required
@@ -920,49 +1046,75 @@ def google_llm_health(request):
 def get_conversation_history(request, meeting_id):
     """
     Get conversation history for a meeting
-    GET /api/meetings/{meeting_id}/conversation-history/
+    GET /api/meetings/{meeting_id}/conversation-history/?include_chunks=0
     """
     try:
-        from .models import ConversationHistory
-        
-        meeting = get_object_or_404(MeetingRoom, id=meeting_id)
+        meeting = get_object_or_404(MeetingRoom.objects.only('id'), id=meeting_id)
+        # relevant_chunks is the bulky column; summary callers can skip reading it at all
+        include_chunks = request.GET.get('include_chunks', '1') != '0'
+        fields = ['id', 'question', 'response', 'created_at']
+        columns = ['id', 'user_question', 'assistant_response', 'created_at']
+        if include_chunks:
+            fields.append('relevant_chunks')
+            columns.append('relevant_chunks')
         
+        # Stream plain rows; no ConversationHistory instances are built, so there are no FKs to join
         history = ConversationHistory.objects.filter(
-            meeting=meeting,
-            user=request.user
-        ).order_by('created_at')
+            meeting_id=meeting.id,
+            user_id=request.user.id
+        ).order_by('created_at').values_list(*columns)
         
-        return JsonResponse({
-            'success': True,
-            'conversation': [
-                {
-                    'id': item.id,
-                    'question': item.user_question,
-                    'response': item.assistant_response,
-                    'created_at': item.created_at.isoformat(),
-                    'relevant_chunks': item.relevant_chunks
-                }
-                for item in history
-            ]
-        })
+        # Encode each row as it comes off the cursor and splice the fragments into the envelope,
+        # so the full list of dicts never exists at once
+        rows = b','.join(
+            orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+            for row in history.iterator(chunk_size=500)
+        )
+        return HttpResponse(
+            b'{"success":true,"conversation":[' + rows + b']}',
+            content_type='application/json'
+        )
     
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+AGENDA_FIELDS = ('id', 'text', 'order', 'is_ai_generated')
+
+
+def _agenda_values(meeting_id):
+    """Agenda rows for a meeting as plain dicts with the API's keys, in display order"""
+    return MeetingAgendaPoint.objects.filter(meeting_id=meeting_id).order_by('order', 'created_at').values(*AGENDA_FIELDS)
+
+
+def get_meeting_with_agenda(meeting_id, lock=False):
+    """Fetch a meeting (404 if missing) with its agenda points prefetched in display order.
+
+    With ``lock=True`` the meeting row is locked FOR UPDATE (call inside transaction.atomic()).
+    """
+    qs = MeetingRoom.objects.prefetch_related(
+        Prefetch('agenda_points', queryset=MeetingAgendaPoint.objects.order_by('order', 'created_at'))
+    )
+    if lock:
+        qs = qs.select_for_update()
+    return get_object_or_404(qs, id=meeting_id)
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def meeting_agenda(request, meeting_id):
     """Get or add agenda points for a meeting."""
-    meeting = get_object_or_404(MeetingRoom, id=meeting_id)
-
     if request.method == "POST":
+        meeting = get_object_or_404(MeetingRoom.objects.only('id'), id=meeting_id)
         try:
-            payload = json.loads(request.body.decode('utf-8'))
-            text = payload.get('text', '').strip()
+            try:
+                text = read_text_field(request.body, 'text')
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
             if not text:
                 return JsonResponse({'error': 'Text is required'}, status=400)
-            max_order = meeting.agenda_points.aggregate(models.Max('order')).get('order__max') or 0
+            # MAX() is answered from the (meeting, order, created_at) index; no rows are loaded
+            max_order = MeetingAgendaPoint.objects.filter(meeting_id=meeting.id).aggregate(Max('order'))['order__max'] or 0
             point = MeetingAgendaPoint.objects.create(
                 meeting=meeting,
                 text=text,
@@ -979,47 +1131,55 @@ def meeting_agenda(request, meeting_id):
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
 
-    points = list(meeting.agenda_points.all())
+    meeting = get_object_or_404(MeetingRoom.objects.only('id', 'title', 'description'), id=meeting_id)
+    # Serialize straight from values() rows; no model instances for a read-only listing
+    points = list(_agenda_values(meeting.id))
     if not points:
         generated = generate_agenda_points(meeting.title, meeting.description, meeting.id)
-        for idx, text in enumerate(generated, start=1):
-            MeetingAgendaPoint.objects.create(
+        created = MeetingAgendaPoint.objects.bulk_create([
+            MeetingAgendaPoint(
                 meeting=meeting,
                 text=text,
                 order=idx,
                 created_by=None,
                 is_ai_generated=True
             )
-        points = list(meeting.agenda_points.all())
+            for idx, text in enumerate(generated, start=1)
+        ], batch_size=100)
+        if all(point.pk for point in created):
+            points = [{field: getattr(point, field) for field in AGENDA_FIELDS} for point in created]
+        else:
+            # Backend couldn't return primary keys from the multi-row INSERT
+            points = list(_agenda_values(meeting.id))
 
-    return JsonResponse({
-        'points': [
-            {
-                'id': point.id,
-                'text': point.text,
-                'order': point.order,
-                'is_ai_generated': point.is_ai_generated
-            }
-            for point in points
-        ]
-    })
+    return orjson_response({'points': points})
 
 
 @login_required
 @require_http_methods(["POST", "DELETE"])
 def delete_agenda_point(request, meeting_id, point_id):
     """Remove an agenda point and resequence ordering."""
-    meeting = get_object_or_404(MeetingRoom, id=meeting_id)
-    point = get_object_or_404(MeetingAgendaPoint, id=point_id, meeting=meeting)
-    point.delete()
-
-    remaining = list(meeting.agenda_points.order_by('order', 'created_at'))
-    for idx, item in enumerate(remaining, start=1):
-        if item.order != idx:
-            item.order = idx
-            item.save(update_fields=['order'])
+    # Delete + resequence commit together; the meeting row lock serializes concurrent agenda edits
+    with transaction.atomic():
+        meeting = get_meeting_with_agenda(meeting_id, lock=True)
+        # Single filtered DELETE; the row count doubles as the existence check
+        deleted, _ = MeetingAgendaPoint.objects.filter(id=point_id, meeting_id=meeting.id).delete()
+        if not deleted:
+            raise Http404('Agenda point not found')
+        points = list(meeting.agenda_points.all())
 
-    return JsonResponse({
+        # The prefetched list is already ordered; just drop the deleted point
+        remaining = [item for item in points if item.id != point_id]
+        to_update = []
+        for idx, item in enumerate(remaining, start=1):
+            if item.order != idx:
+                item.order = idx
+                to_update.append(item)
+        if to_update:
+            # One UPDATE ... CASE WHEN statement instead of a save() per row
+            MeetingAgendaPoint.objects.bulk_update(to_update, ['order'], batch_size=500)
+
+    return orjson_response({
         'success': True,
         'points': [
             {
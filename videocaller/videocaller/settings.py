@@ -183,6 +183,12 @@ AGORA_RECORDING_REGION = os.environ.get('AGORA_RECORDING_REGION', 'NA')
 
 # AssemblyAI Configuration
 ASSEMBLYAI_API_KEY = os.environ.get('ASSEMBLYAI_API_KEY')
+# Shared secret AssemblyAI echoes back on transcript webhooks; without it transcription polls
+ASSEMBLYAI_WEBHOOK_SECRET = os.environ.get('ASSEMBLYAI_WEBHOOK_SECRET')
+
+# Public base URL (e.g. https://meet.example.com) used for third-party callbacks;
+# when unset, transcription falls back to polling
+SITE_URL = os.environ.get('SITE_URL', '')
 
 # Google Gemini Configuration for RAG
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
@@ -193,6 +199,12 @@ GOOGLE_GENERATE_MODEL = os.environ.get('GOOGLE_GENERATE_MODEL', 'gemini-2.5-flas
 GOOGLE_CONNECT_TIMEOUT = int(os.environ.get('GOOGLE_CONNECT_TIMEOUT', 10))
 GOOGLE_READ_TIMEOUT = int(os.environ.get('GOOGLE_READ_TIMEOUT', 600))
 GOOGLE_MAX_TOKENS = int(os.environ.get('GOOGLE_MAX_TOKENS', 1000))
+# Comma-separated models probed by /api/health/google/all/ (defaults to the generate model)
+GOOGLE_HEALTH_MODELS = [
+    model.strip()
+    for model in os.environ.get('GOOGLE_HEALTH_MODELS', GOOGLE_GENERATE_MODEL).split(',')
+    if model.strip()
+]
 
 # Ollama Configuration for RAG
 def _get_bool_env(name, default=False):
@@ -239,6 +251,20 @@ if redis_url:
         'ssl_cert_reqs': None if parsed.scheme == 'rediss' else False
     }
 
+# Share the cache between the web and worker processes when Redis is available
+# (the scheduled Google health probe writes its result here). This backs every cache user,
+# not just the probe: cached meeting rooms and Gemini health results move from per-process LocMem
+# to Redis. KEY_PREFIX keeps these keys apart from django-q's traffic on the same database.
+if redis_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': redis_url,
+            'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'aimeet'),
+            'OPTIONS': {'ssl_cert_reqs': None} if redis_url.startswith('rediss://') else {},
+        }
+    }
+
 Q_CLUSTER = {
     'name': 'videocaller',
     'workers': 2,